@@ -1,7 +1,8 @@
 """Directory analysis for music organization."""
 
+import os
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from ..metadata import MetadataExtractor
 
@@ -9,15 +10,24 @@ from ..metadata import MetadataExtractor
 class DirectoryAnalyzer:
     """Analyzes directory structures and extracts metadata."""
 
+    # Lines kept in directory_tree; large collections would otherwise render tens of KB
+    TREE_MAX_NODES = 50
+
     def __init__(self):
         """Initialize the directory analyzer."""
         self.metadata_extractor = MetadataExtractor()
 
-    def analyze_directory_structure(self, folder: Path) -> Dict:
+    def clear_caches(self) -> None:
+        """Drop cached per-file tags, e.g. when the source directory changes."""
+        self.metadata_extractor.clear_cache()
+
+    def analyze_directory_structure(self, folder: Path, render_tree: bool = True) -> Dict:
         """Analyze the directory structure and return detailed information.
 
         Args:
             folder: Path to the folder to analyze
+            render_tree: Also render directory_tree (capped at TREE_MAX_NODES
+                lines); callers that only need the counts can skip it
 
         Returns:
             Dictionary containing structure analysis
@@ -30,102 +40,196 @@ class DirectoryAnalyzer:
             "subdirectories": [],
             "max_depth": 0,
             "directory_tree": "",
+            # Every music file below the folder, so metadata extraction can
+            # skip walking the tree a second time
+            "music_file_paths": [],
         }
 
         # Build directory tree representation
-        tree_lines = []
-        self._build_tree_representation(folder, tree_lines, "", 0, analysis)
-        analysis["directory_tree"] = "\n".join(tree_lines)
+        tree_lines: Optional[List[str]] = [] if render_tree else None
+        self._build_tree_representation(folder, tree_lines, analysis)
+        if tree_lines is not None:
+            analysis["directory_tree"] = "\n".join(tree_lines)
 
         return analysis
 
     def _build_tree_representation(
-        self, path: Path, tree_lines: List[str], prefix: str, depth: int, analysis: Dict
+        self, folder: Path, tree_lines: Optional[List[str]], analysis: Dict
     ):
-        """Recursively build a tree representation of the directory structure.
+        """Walk the folder (four levels deep) building the tree lines and counts.
+
+        Traversal is depth-first with an explicit stack of per-directory
+        iterators, so lines come out in the same pre-order a recursive walk
+        would produce without a Python frame per directory.
 
         Args:
-            path: Current path being processed
-            tree_lines: List to accumulate tree lines
-            prefix: Current prefix for tree formatting
-            depth: Current depth in the tree
+            folder: Folder being analyzed
+            tree_lines: List to accumulate tree lines, or None to only collect counts
             analysis: Analysis dictionary to update
         """
-        if depth > analysis["max_depth"]:
-            analysis["max_depth"] = depth
-
+        is_music = MetadataExtractor.is_music_name
         try:
-            items = sorted(path.iterdir(), key=lambda x: (x.is_file(), x.name.lower()))
-        except (PermissionError, FileNotFoundError, OSError):
-            tree_lines.append(f"{prefix}├── [Permission Denied]")
+            items = self._scan_dir(folder)
+        except OSError:
+            self._add_tree_line(tree_lines, "├── [Permission Denied]")
             return
 
-        for i, item in enumerate(items):
-            is_last = i == len(items) - 1
-            current_prefix = "└── " if is_last else "├── "
-            tree_lines.append(f"{prefix}{current_prefix}{item.name}")
+        # (remaining (index, entry) pairs, entry count, line prefix, depth)
+        stack = [(iter(enumerate(items)), len(items), "", 0)]
+        while stack:
+            entries, count, prefix, depth = stack[-1]
+            nxt = next(entries, None)
+            if nxt is None:
+                stack.pop()
+                continue
+            i, item = nxt
+            is_last = i == count - 1
+            if tree_lines is not None:
+                current_prefix = "└── " if is_last else "├── "
+                self._add_tree_line(tree_lines, f"{prefix}{current_prefix}{item.name}")
 
             if item.is_file():
                 # Check if it's a music file
-                if item.suffix.lower() in MetadataExtractor.SUPPORTED_FORMATS:
+                if is_music(item.name):
                     analysis["total_music_files"] += 1
                     if depth == 0:
                         analysis["direct_music_files"] += 1
+                        analysis["music_file_paths"].append(item.path)
             elif item.is_dir():
-                # Record subdirectory info
-                subdir_info = {
-                    "name": item.name,
-                    "path": str(item),
-                    "depth": depth + 1,
-                    "music_files": 0,
-                    "music_basenames": [],
-                    "subdirectories": [],
-                }
-
-                # Count music files in subdirectory
-                try:
-                    # Count recursively, case-insensitive by suffix check
-                    count = 0
-                    basenames = set()
-                    for p in item.rglob("*"):
+                # Only top-level subdirectories are reported, so deeper ones
+                # skip the recursive count entirely
+                if depth == 0:
+                    # Count music files and list child directories in one pass
+                    # Symlinked directories are listed but, like the metadata walk, not read
+                    music_count, basenames, child_dirs = self._count_music_recursive(
+                        item.path, None if item.is_symlink() else analysis["music_file_paths"]
+                    )
+                    analysis["subdirectories"].append({
+                        "name": item.name,
+                        "path": item.path,
+                        "depth": depth + 1,
+                        "music_files": music_count,
+                        # Sorted for stable output/testing; lowercased for case-insensitive distinctness
+                        "music_basenames": sorted(basenames),
+                        "subdirectories": child_dirs,
+                    })
+
+                # Descend into the subdirectory (limit depth to avoid huge trees)
+                if depth < 3:
+                    next_prefix = prefix + ("    " if is_last else "│   ")
+                    if depth + 1 > analysis["max_depth"]:
+                        analysis["max_depth"] = depth + 1
+                    try:
+                        children = self._scan_dir(item.path)
+                    except OSError:
+                        self._add_tree_line(tree_lines, f"{next_prefix}├── [Permission Denied]")
+                        continue
+                    stack.append((iter(enumerate(children)), len(children), next_prefix, depth + 1))
+
+    @classmethod
+    def _add_tree_line(cls, tree_lines: Optional[List[str]], line: str) -> None:
+        if tree_lines is None:
+            return
+        if len(tree_lines) < cls.TREE_MAX_NODES:
+            tree_lines.append(line)
+        elif len(tree_lines) == cls.TREE_MAX_NODES:
+            tree_lines.append("... (truncated)")
+
+    @staticmethod
+    def _count_music_recursive(
+        path: str, paths: Optional[List[str]] = None
+    ) -> Tuple[int, Set[str], List[str]]:
+        """Count music files below path in a single scandir traversal.
+
+        Returns (music file count, lowercased music basenames, names of path's
+        immediate child directories); music file paths are appended to paths
+        when given. Symlinked directories are listed but not descended, like
+        os.walk; unreadable directories are skipped.
+        """
+        is_music = MetadataExtractor.is_music_name
+        count = 0
+        basenames: Set[str] = set()
+        child_dirs: List[str] = []
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
                         try:
-                            if p.is_file() and p.suffix.lower() in MetadataExtractor.SUPPORTED_FORMATS:
+                            if entry.is_dir():
+                                if current is path:
+                                    child_dirs.append(entry.name)
+                                if not entry.is_symlink():
+                                    stack.append(entry.path)
+                            elif is_music(entry.name) and entry.is_file():
                                 count += 1
-                                basenames.add(p.name.lower())
-                        except (PermissionError, OSError):
+                                basenames.add(entry.name.lower())
+                                if paths is not None:
+                                    paths.append(entry.path)
+                        except OSError:
                             continue
-                    subdir_info["music_files"] = count
-                    # Store sorted list for stable output/testing; lowercased for case-insensitive distinctness
-                    subdir_info["music_basenames"] = sorted(basenames)
-                except Exception:
-                    subdir_info["music_files"] = 0
-                    subdir_info["music_basenames"] = []
-
-                # Count subdirectories
-                try:
-                    subdir_info["subdirectories"] = [
-                        d.name for d in item.iterdir() if d.is_dir()
-                    ]
-                except (PermissionError, OSError, FileNotFoundError):
-                    subdir_info["subdirectories"] = []
+            except OSError:
+                continue
+        return count, basenames, child_dirs
 
-                if depth == 0:
-                    analysis["subdirectories"].append(subdir_info)
+    @staticmethod
+    def _scan_dir(path: Union[str, Path]) -> List[os.DirEntry]:
+        """List path once, directories first, then by case-insensitive name.
 
-                # Recursively process subdirectory (limit depth to avoid huge trees)
-                if depth < 3:
-                    next_prefix = prefix + ("    " if is_last else "│   ")
-                    self._build_tree_representation(
-                        item, tree_lines, next_prefix, depth + 1, analysis
-                    )
+        DirEntry caches the file type from the listing, so the sort key and the
+        later is_file()/is_dir() checks do not stat each entry again.
+        """
+        with os.scandir(path) as it:
+            entries = list(it)
+        entries.sort(key=lambda e: (e.is_file(), e.name.lower()))
+        return entries
+
+    @staticmethod
+    def subfolder_structures(structure: Dict) -> Dict[str, Dict]:
+        """Split an analysis's file listing into one per top-level subdirectory.
+
+        Returns {subdirectory path: structure} with the music_file_paths and
+        subdirectories that extract_folder_metadata reuses, so each album of a
+        collection is read without walking it again. Subdirectories whose
+        listing is incomplete (symlinked ones are not descended) are left out.
+        """
+        root = structure.get("folder_path")
+        if not root:
+            return {}
+        prefix_len = len(os.path.join(root, ""))
+        by_name: Dict[str, List[str]] = {}
+        for path in structure.get("music_file_paths", []):
+            name, sep, _ = path[prefix_len:].partition(os.sep)
+            if sep:
+                by_name.setdefault(name, []).append(path)
+        result: Dict[str, Dict] = {}
+        for sub in structure.get("subdirectories", []):
+            paths = by_name.get(sub["name"], [])
+            if "path" in sub and len(paths) == sub.get("music_files"):
+                result[sub["path"]] = {
+                    "music_file_paths": paths,
+                    "subdirectories": [{"name": name} for name in sub.get("subdirectories", [])],
+                }
+        return result
 
-    def extract_folder_metadata(self, folder: Path) -> Dict:
+    def extract_folder_metadata(self, folder: Path, structure: Optional[Dict] = None) -> Dict:
         """Extract metadata from all music files in a folder.
 
         Args:
             folder: Path to the folder to analyze
+            structure: This folder's analyze_directory_structure result, whose
+                file listing is reused instead of walking the folder again
 
         Returns:
             Dictionary containing folder metadata
         """
-        return self.metadata_extractor.extract_folder_metadata(folder)
+        if structure is None or "music_file_paths" not in structure:
+            metadata = self.metadata_extractor.extract_folder_metadata(folder)
+        else:
+            metadata = self.metadata_extractor.extract_folder_metadata(
+                folder,
+                file_paths=structure["music_file_paths"],
+                subdirectories=[sub["name"] for sub in structure["subdirectories"]],
+            )
+        return metadata
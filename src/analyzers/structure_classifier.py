@@ -1,30 +1,65 @@
 """Structure classification for music directories."""
 
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+import json
 import re
-from src.inference import InferenceProvider
+from src.inference import InferenceProvider, PromptCache, cache_dir_from_env
 import logging
 
 logger = logging.getLogger("wts.structure_classifier")
 
+# Disc-like subdirectory names: "CD1", "Volume 1 - good stuff", "part 2"
+_DISC_PATTERN_RE = re.compile(r"(?:cd|disc|disk|vol(?:ume)?|part|set) *[12]", re.IGNORECASE)
+# Subdirectory names that are nothing but a disc label: "CD1", "Disc 2", "disk 03"
+_DISC_ONLY_RE = re.compile(r"(?:cd|dis[ck])\s*\d+", re.IGNORECASE)
+
+_CLASSIFICATION_TYPES_TEXT = """1. "single_album" - All music files are in the root directory or it's clearly a single album
+2. "multi_disc_album" - Multiple subdirectories that appear to be discs of the same album (e.g., "CD1", "CD2", "Disc 1", "Disc 2"). This includes if there are tracks at the top level and then a subdir with some bonus content.
+3. "artist_collection" - Multiple subdirectories that appear to be different albums by the same artist
+4. "unknown" - The structure is not clear or not enough information to classify"""
+
 class StructureClassifier:
     """Classifies directory structures using LLM and heuristics."""
 
     def __init__(self, inference: InferenceProvider):
         """Initialize the structure classifier with a unified inference interface."""
         self.inference = inference
+        # Valid LLM answers keyed by model + prompt; re-scans and re-queued
+        # folders reuse them instead of running inference again
+        self._cache = PromptCache(
+            cache_dir_from_env("WTS_CLASSIFICATION_CACHE_DIR", "classifications"),
+            getattr(inference, "model", ""),
+        )
+
+    VALID_TYPES = ("single_album", "multi_disc_album", "artist_collection")
+    MAX_ANSWER_TOKENS = 16
+    # Heuristic answers at or above this confidence skip the LLM entirely
+    CONFIDENT = 0.9
+
+    def classify_directory_structure(self, structure_analysis: Dict, refresh: bool = False) -> str:
+        """Classify one folder; with refresh, a cached LLM answer is not reused
+        (the folder is being reconsidered) and the new answer replaces it."""
+        classification, confidence = self._heuristic_with_confidence(structure_analysis)
+        if confidence >= self.CONFIDENT:
+            return classification
 
-    def classify_directory_structure(self, structure_analysis: Dict) -> str:
         prompt = self.build_classification_prompt(structure_analysis)
 
+        cached = None if refresh else self._cache.get(prompt)
+        if cached in self.VALID_TYPES:
+            return cached
+
         try:
             print(f"Prompt: {prompt}")
-            classification = self.inference.generate(prompt).strip().lower()
+            # The answer is a single label, a handful of tokens at most
+            classification = self.inference.generate(
+                prompt, max_tokens=self.MAX_ANSWER_TOKENS
+            ).strip().lower()
             print(f"Classification: {classification}")
 
             # Validate classification
-            valid_types = ["single_album", "multi_disc_album", "artist_collection"]
-            if classification in valid_types:
+            if classification in self.VALID_TYPES:
+                self._cache.put(prompt, classification)
                 return classification
             else:
                 # Fallback classification based on heuristics
@@ -34,15 +69,100 @@ class StructureClassifier:
             print(e)
             return self._heuristic_classification(structure_analysis)
 
+    def classify_batch(self, structure_analyses: List[Dict]) -> List[str]:
+        """Classify several folders, sending all uncertain ones in a single prompt.
+
+        Confident heuristics and cached answers are resolved locally first. If
+        the batch answer is missing, malformed or the wrong length, each
+        remaining folder falls back to classify_directory_structure.
+        """
+        results: List[Optional[str]] = []
+        pending: List[int] = []
+        for i, analysis in enumerate(structure_analyses):
+            classification, confidence = self._heuristic_with_confidence(analysis)
+            if confidence < self.CONFIDENT:
+                cached = self._cache.get(self.build_classification_prompt(analysis))
+                classification = cached if cached in self.VALID_TYPES else None
+            results.append(classification)
+            if classification is None:
+                pending.append(i)
+
+        if len(pending) > 1:
+            labels = self._classify_pending([structure_analyses[i] for i in pending])
+            if labels is not None:
+                for i, label in zip(pending, labels):
+                    analysis = structure_analyses[i]
+                    if label in self.VALID_TYPES:
+                        self._cache.put(self.build_classification_prompt(analysis), label)
+                        results[i] = label
+                    else:
+                        results[i] = self._heuristic_classification(analysis)
+
+        return [
+            result if result is not None else self.classify_directory_structure(analysis)
+            for result, analysis in zip(results, structure_analyses)
+        ]
+
+    def _classify_pending(self, structure_analyses: List[Dict]) -> Optional[List[str]]:
+        """One LLM call for several folders; None if the answer is unusable."""
+        count = len(structure_analyses)
+        schema = {
+            "type": "object",
+            "properties": {
+                "classifications": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": [*self.VALID_TYPES, "unknown"]},
+                    "minItems": count,
+                    "maxItems": count,
+                }
+            },
+            "required": ["classifications"],
+        }
+        try:
+            text = self.inference.generate(
+                self.build_batch_classification_prompt(structure_analyses),
+                expect_json=True,
+                max_tokens=self.MAX_ANSWER_TOKENS * count + 16,
+                json_schema=schema,
+            )
+            start = text.find("{")
+            labels = json.loads(text[start:text.rfind("}") + 1])["classifications"] if start != -1 else None
+        except Exception as e:
+            logger.warning(f"Batch classification failed: {e}")
+            return None
+        if not isinstance(labels, list) or len(labels) != count:
+            return None
+        return [str(label).strip().lower() for label in labels]
+
     def build_classification_prompt(self, structure_analysis: Dict) -> str:
+        # The counts and subdirectory summary carry the structure; the rendered
+        # tree (every file name, three levels deep) only multiplied prompt tokens
         prompt = f"""You are a music collection organization expert. Analyze the following directory structure and classify it into one of these types:
 
-1. "single_album" - All music files are in the root directory or it's clearly a single album
-2. "multi_disc_album" - Multiple subdirectories that appear to be discs of the same album (e.g., "CD1", "CD2", "Disc 1", "Disc 2"). This includes if there are tracks at the top level and then a subdir with some bonus content.
-3. "artist_collection" - Multiple subdirectories that appear to be different albums by the same artist
-4. "unknown" - The structure is not clear or not enough information to classify
+{_CLASSIFICATION_TYPES_TEXT}
+
+{self._format_structure(structure_analysis)}
+
+Based on this structure, classify it as exactly one of: single_album, multi_disc_album, artist_collection, or unknown
+
+Respond with ONLY the classification (one of the four options above)."""
+        return prompt
 
-Directory Analysis:
+    def build_batch_classification_prompt(self, structure_analyses: List[Dict]) -> str:
+        folders = "\n\n".join(
+            f"Folder {i}:\n{self._format_structure(analysis)}"
+            for i, analysis in enumerate(structure_analyses, 1)
+        )
+        return f"""You are a music collection organization expert. Analyze each of the following {len(structure_analyses)} directory structures independently and classify each into one of these types:
+
+{_CLASSIFICATION_TYPES_TEXT}
+
+{folders}
+
+Respond with ONLY a JSON object of the form {{"classifications": [...]}} holding exactly {len(structure_analyses)} classifications, one per folder in the order given, each one of: single_album, multi_disc_album, artist_collection, unknown"""
+
+    def _format_structure(self, structure_analysis: Dict) -> str:
+        return f"""Directory Analysis:
 - Folder Name: {structure_analysis["folder_name"]}
 - Total Music Files: {structure_analysis["total_music_files"]}
 - Direct Music Files (in root): {structure_analysis["direct_music_files"]}
@@ -50,15 +170,7 @@ Directory Analysis:
 - Max Depth: {structure_analysis["max_depth"]}
 
 Subdirectories:
-{self._format_subdirectories(structure_analysis["subdirectories"])}
-
-Directory Tree:
-{structure_analysis["directory_tree"]}
-
-Based on this structure, classify it as exactly one of: single_album, multi_disc_album, artist_collection, or unknown
-
-Respond with ONLY the classification (one of the four options above)."""
-        return prompt
+{self._format_subdirectories(structure_analysis["subdirectories"])}"""
 
     def _format_subdirectories(self, subdirectories: list) -> str:
         if not subdirectories:
@@ -77,6 +189,31 @@ Respond with ONLY the classification (one of the four options above)."""
         return "\n".join(lines)
 
     def _heuristic_classification(self, structure_analysis: Dict) -> str:
+        return self._heuristic_with_confidence(structure_analysis)[0]
+
+    def _heuristic_with_confidence(self, structure_analysis: Dict) -> Tuple[str, float]:
+        """Heuristic classification plus how sure it is (0-1).
+
+        Only unambiguous layouts score high: loose tracks with no subdirectories,
+        or no loose tracks and nothing but plain disc folders ("CD1", "Disc 2").
+        """
+        subdirs = structure_analysis["subdirectories"]
+        direct_files = structure_analysis["direct_music_files"]
+
+        if direct_files > 0 and not subdirs:
+            return "single_album", 1.0
+        if (
+            direct_files == 0
+            and len(subdirs) >= 2
+            and all(
+                _DISC_ONLY_RE.fullmatch(s.get("name", "").strip()) and not s.get("subdirectories")
+                for s in subdirs
+            )
+        ):
+            return "multi_disc_album", 0.95
+        return self._heuristic_guess(structure_analysis), 0.5
+
+    def _heuristic_guess(self, structure_analysis: Dict) -> str:
         subdirs = structure_analysis["subdirectories"]
         direct_files = structure_analysis["direct_music_files"]
 
@@ -94,10 +231,6 @@ Respond with ONLY the classification (one of the four options above)."""
         return "undefined"
 
     def _has_multi_disk_pattern(self, subdirs: list) -> bool:
-        for s in subdirs:
-            # "Volume 1 - good sutuff" -> "volume1goodstuff"
-            name = s.get("name", "").lower().replace(" ", "")
-            for pattern in ["cd1", "cd2", "disc1", "disc2", "volume1", "volume2", "part1", "part2", "vol1", "vol2", "disk1", "disk2", "set1", "set2"]:
-                if pattern in name:
-                    return True
-        return False
\ No newline at end of file
+        return any(
+            _DISC_PATTERN_RE.search(s.get("name", "")) for s in subdirs
+        )
\ No newline at end of file
@@ -4,12 +4,33 @@ import json
 import re
 from pathlib import Path
 from typing import Dict, Optional
-from src.inference import InferenceProvider
-import re as _re
+from src.inference import InferenceProvider, PromptCache, cache_dir_from_env
 import logging
 import os
 
 
+# Folder names like "2010 - Album Title"
+_YEAR_ALBUM_RE = re.compile(r"^(?P<year>\d{4})\s*-\s*(?P<album>.+)$")
+# raw_decode parses one JSON value from a position and reports where it ended
+_JSON_DECODER = json.JSONDecoder()
+# A proposal object with a short reasoning field fits well inside this
+PROPOSAL_MAX_TOKENS = 512
+RELEASE_TYPES = ("Album", "EP", "Single", "Compilation", "Live", "Remix", "Bootleg")
+# Sent as structured-output schema so local servers constrain decoding to it;
+# _parse_llm_response still validates for providers that ignore it
+PROPOSAL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "artist": {"type": "string"},
+        "album": {"type": "string"},
+        "year": {"type": "string"},
+        "release_type": {"type": "string", "enum": list(RELEASE_TYPES)},
+        "confidence": {"type": "string", "enum": ["low", "medium", "high"]},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["artist", "album", "year", "release_type", "confidence", "reasoning"],
+}
+
 
 class ProposalGenerator:
     """Generates organization proposals using LLM."""
@@ -25,6 +46,12 @@ class ProposalGenerator:
             handler.setFormatter(formatter)
             self._logger.addHandler(handler)
             self._logger.setLevel(logging.DEBUG)
+        # Parsed LLM proposals keyed by model + prompt, so re-runs and crashed
+        # sessions do not pay for the same generation twice
+        self._cache = PromptCache(
+            cache_dir_from_env("WTS_PROPOSAL_CACHE_DIR", "proposals"),
+            getattr(self.inference, "model", ""),
+        )
 
     def get_llm_proposal(
         self,
@@ -32,6 +59,7 @@ class ProposalGenerator:
         user_feedback: Optional[str] = None,
         artist_hint: Optional[str] = None,
         folder_path: Optional[str] = None,
+        refresh: bool = False,
     ) -> Dict:
         """Get organization proposal from the LLM.
 
@@ -39,6 +67,8 @@ class ProposalGenerator:
             metadata: Folder metadata from DirectoryAnalyzer
             user_feedback: Optional user feedback for reconsideration
             artist_hint: Optional artist hint for collections
+            refresh: Ask the LLM even if this prompt has a cached proposal
+                (reconsidered folders); the new answer replaces the cached one
 
         Returns:
             Dictionary containing the proposal
@@ -49,10 +79,18 @@ class ProposalGenerator:
         prompt = self._build_prompt(metadata, user_feedback, artist_hint, folder_path)
         self._logger.debug("PROMPT BEGIN\n%s\nPROMPT END", prompt)
 
+        cached = None if refresh else self._cache.get(prompt)
+        if isinstance(cached, dict):
+            self._logger.debug("PROPOSAL CACHE HIT")
+            return cached
+
         # Get LLM response
         try:
             # Parse response
-            text = self.inference.generate(prompt).strip()
+            # The proposal is a single JSON object; stop once it is complete
+            text = self.inference.generate(
+                prompt, expect_json=True, max_tokens=PROPOSAL_MAX_TOKENS, json_schema=PROPOSAL_SCHEMA
+            ).strip()
             self._logger.debug("RESPONSE BEGIN\n%s\nRESPONSE END", text)
 
             # Try to extract JSON
@@ -60,6 +98,7 @@ class ProposalGenerator:
 
             # If JSON parsing succeeded, return the proposal
             if proposal:
+                self._cache.put(prompt, proposal)
                 return proposal
 
             # If JSON parsing failed, use fallback logic
@@ -95,7 +134,7 @@ class ProposalGenerator:
 
         # Heuristic parsing from folder name like "YYYY - Album Title"
         def _parse_from_folder(name: str):
-            m = _re.match(r"^(?P<year>\d{4})\s*-\s*(?P<album>.+)$", name)
+            m = _YEAR_ALBUM_RE.match(name)
             if m:
                 return m.group("album").strip(), m.group("year").strip()
             return name.strip(), None
@@ -184,16 +223,26 @@ JSON schema:
             Dictionary containing the parsed proposal
         """
         try:
-            # Find JSON in response - fix the regex to capture complete JSON
-            json_match = re.search(r"\{.*\}", text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                proposal = json.loads(json_str)
-
-                # Validate required fields
-                required = ["artist", "album", "year", "release_type"]
-                if all(field in proposal for field in required):
-                    return proposal
+            # Decode the first complete JSON object in the response. Unlike a
+            # regex, the decoder respects nesting and braces inside strings, and
+            # ignores any prose (even prose with braces) around the object.
+            start = text.find("{")
+            error: Optional[ValueError] = None
+            while start != -1:
+                try:
+                    proposal, _ = _JSON_DECODER.raw_decode(text, start)
+                except ValueError as e:
+                    error = error or e
+                    start = text.find("{", start + 1)
+                    continue
+                if isinstance(proposal, dict):
+                    # Validate required fields
+                    required = ["artist", "album", "year", "release_type"]
+                    if all(field in proposal for field in required):
+                        return proposal
+                return None
+            if error is not None:
+                raise error
         except Exception as e:
             # Quiet terminal; log details
             try:
@@ -221,7 +270,7 @@ JSON schema:
         folder_name = (
             Path(folder_path).name if folder_path else metadata.get("folder_name", "Unknown")
         )
-        m = _re.match(r"^(?P<year>\d{4})\s*-\s*(?P<album>.+)$", folder_name)
+        m = _YEAR_ALBUM_RE.match(folder_name)
         album_from_folder = m.group("album").strip() if m else folder_name
         year_from_folder = m.group("year").strip() if m else None
 
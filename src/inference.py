@@ -5,43 +5,143 @@ Every inference call takes a single prompt string and returns a single string.
 
 from __future__ import annotations
 
+import hashlib
+import importlib
+import json
 import os
+import time
 from abc import ABC, abstractmethod
+from pathlib import Path
 from tenacity import retry, stop_after_attempt, wait_exponential
-from typing import Optional
+from typing import Any, Dict, Optional
 
-# Optional, lazily used imports exposed for easier mocking in tests
-try:  # pragma: no cover - best-effort optional dependency
-    from openai import OpenAI  # type: ignore
-except Exception:  # pragma: no cover
-    OpenAI = None  # type: ignore
+# Optional client libraries, imported on first use so that processes which never
+# call a given provider (scan/move workers, the CLI) do not pay for loading it.
+# They are still exposed as module attributes (OpenAI, genai, requests) for mocking.
+_OPTIONAL_IMPORTS = {
+    "OpenAI": ("openai", "OpenAI"),
+    "genai": ("google.generativeai", None),
+    "requests": ("requests", None),
+}
 
-try:  # pragma: no cover
-    import google.generativeai as genai  # type: ignore
-except Exception:  # pragma: no cover
-    genai = None  # type: ignore
 
-try:  # pragma: no cover
-    import requests  # type: ignore
-except Exception:  # pragma: no cover
-    requests = None  # type: ignore
+def _import_optional(name: str) -> Any:
+    module_name, attr = _OPTIONAL_IMPORTS[name]
+    try:  # pragma: no cover - best-effort optional dependency
+        module = importlib.import_module(module_name)
+        value = getattr(module, attr) if attr else module
+    except Exception:  # pragma: no cover
+        value = None
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name: str) -> Any:
+    if name in _OPTIONAL_IMPORTS:
+        return _import_optional(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _optional(name: str) -> Any:
+    """Return an optional dependency (or None), honouring anything patched onto the module."""
+    try:
+        return globals()[name]
+    except KeyError:
+        return _import_optional(name)
+
+
+# OpenAI-compatible JSON mode
+_JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+
+def _response_format(json_schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """JSON mode, or structured output when a schema is given.
+
+    llama.cpp server and Ollama turn the schema into a sampling grammar, so the
+    required keys and enum values are guaranteed rather than requested.
+    """
+    if json_schema is None:
+        return _JSON_RESPONSE_FORMAT
+    return {"type": "json_schema", "json_schema": {"name": "response", "schema": json_schema}}
+
+
+def _stream_enabled() -> bool:
+    return (os.getenv("STREAM_PROMPTS") or "").lower() in ("1", "true", "yes")
+
+
+class _JsonObjectTracker:
+    """Follows streamed text and reports when the first JSON object closes.
+
+    Braces inside JSON strings are ignored, as are quotes in any prose
+    before the opening brace.
+    """
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> bool:
+        """Consume chunk; True once the first top-level object is complete."""
+        for ch in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif not self.started:
+                continue
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
 
 
 class TextProvider(ABC):
     """Abstract text generation provider.
 
     Subclasses must implement _generate to return plain text for a given prompt and model.
+    With expect_json, providers that support it ask the server for JSON-mode
+    (grammar-constrained) decoding and stop reading once the first JSON object
+    in the output is complete, so the server stops generating tokens.
+    max_tokens caps the answer length where the provider applies it, and
+    json_schema (with expect_json) narrows JSON mode to that schema.
     """
 
     @abstractmethod
-    def _generate(self, prompt: str, model: str) -> str:
+    def _generate(
+        self,
+        prompt: str,
+        model: str,
+        expect_json: bool = False,
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
         """Provider-specific generation without retries."""
         raise NotImplementedError
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def generate(self, prompt: str, model: str) -> str:
+    def generate(
+        self,
+        prompt: str,
+        model: str,
+        expect_json: bool = False,
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
         """Generate text for a given prompt and model with retry logic."""
-        return self._generate(prompt, model)
+        return self._generate(
+            prompt, model, expect_json=expect_json, max_tokens=max_tokens, json_schema=json_schema
+        )
 
 
 
@@ -52,17 +152,33 @@ class OpenAITextProvider(TextProvider):
             raise RuntimeError(
                 "OPENAI_API_KEY is required when using the OpenAI provider"
             )
-
-    def _generate(self, prompt: str, model: str) -> str:
-        if OpenAI is None:
-            raise RuntimeError("openai client library not installed")
-        client = OpenAI(api_key=self._api_key)
-        stream_enabled = (os.getenv("STREAM_PROMPTS") or "").lower() in (
-            "1",
-            "true",
-            "yes",
-        )
-        if stream_enabled:
+        self._client = None
+
+    def _get_client(self):
+        # One client per provider: its HTTP pool keeps connections alive across
+        # calls instead of paying a fresh TLS handshake for every prompt.
+        if self._client is None:
+            openai_client = _optional("OpenAI")
+            if openai_client is None:
+                raise RuntimeError("openai client library not installed")
+            self._client = openai_client(api_key=self._api_key)
+        return self._client
+
+    def _generate(
+        self,
+        prompt: str,
+        model: str,
+        expect_json: bool = False,
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        # max_tokens is not forwarded: reasoning models spend hidden tokens
+        # from the same budget, so a tight cap can leave no visible answer
+        client = self._get_client()
+        # JSON mode constrains sampling to a valid JSON object: no fences or prose
+        extra = {"response_format": _response_format(json_schema)} if expect_json else {}
+        # Early stop needs the tokens as they arrive, so it implies streaming
+        if expect_json or _stream_enabled():
             completion = client.chat.completions.create(
                 model=model,
                 messages=[
@@ -70,13 +186,21 @@ class OpenAITextProvider(TextProvider):
                     {"role": "user", "content": prompt},
                 ],
                 stream=True,
+                **extra,
             )
             chunks = []
+            tracker = _JsonObjectTracker() if expect_json else None
             for event in completion:
                 # The SDK yields events with .choices[0].delta.content during streaming
                 delta = getattr(event.choices[0].delta, "content", None)
                 if delta:
                     chunks.append(delta)
+                    if tracker is not None and tracker.feed(delta):
+                        # Closing the stream drops the connection and ends generation
+                        close = getattr(completion, "close", None)
+                        if close is not None:
+                            close()
+                        break
             return "".join(chunks)
         else:
             resp = client.chat.completions.create(
@@ -97,12 +221,21 @@ class GeminiTextProvider(TextProvider):
             raise RuntimeError(
                 "GOOGLE_API_KEY (or GEMINI_API_KEY) is required for Gemini provider"
             )
+        genai = _optional("genai")
         if genai is None:
             raise RuntimeError("google-generativeai library not installed")
         genai.configure(api_key=api_key)
         self._genai = genai
 
-    def _generate(self, prompt: str, model: str) -> str:
+    def _generate(
+        self,
+        prompt: str,
+        model: str,
+        expect_json: bool = False,
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        # Non-streaming and without JSON mode here; expect_json, max_tokens and json_schema are advisory only
         gm = self._genai.GenerativeModel(model)
         resp = gm.generate_content(prompt)
         text = getattr(resp, "text", None)
@@ -123,8 +256,16 @@ class LlamaTextProvider(TextProvider):
         self.base_url = base_url or os.getenv("LLAMA_API_BASE", "http://localhost:11434/v1")
         self.api_key = api_key or os.getenv("LLAMA_API_KEY")
 
-    def _generate(self, prompt: str, model: str) -> str:
+    def _generate(
+        self,
+        prompt: str,
+        model: str,
+        expect_json: bool = False,
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
         import json as _json
+        requests = _optional("requests")
         if requests is None:
             raise RuntimeError("requests library not installed")
 
@@ -135,13 +276,21 @@ class LlamaTextProvider(TextProvider):
         payload = {
             "model": model,
             "messages": [{"role": "user", "content": prompt}],
-            "stream": (os.getenv("STREAM_PROMPTS") or "").lower() in ("1", "true", "yes"),
+            # Early stop needs the tokens as they arrive, so it implies streaming
+            "stream": expect_json or _stream_enabled(),
         }
+        if expect_json:
+            # llama.cpp server and Ollama compile this into a JSON grammar for sampling
+            payload["response_format"] = _response_format(json_schema)
+        if max_tokens:
+            # Bounds a rambling local model instead of running to the context limit
+            payload["max_tokens"] = max_tokens
 
         if payload["stream"]:
             with requests.post(url, headers=headers, json=payload, timeout=300, stream=True) as resp:
                 resp.raise_for_status()
                 chunks = []
+                tracker = _JsonObjectTracker() if expect_json else None
                 for line in resp.iter_lines(decode_unicode=True):
                     if not line:
                         continue
@@ -155,6 +304,9 @@ class LlamaTextProvider(TextProvider):
                             )
                             if delta:
                                 chunks.append(delta)
+                                # Leaving the with-block closes the connection, which ends generation
+                                if tracker is not None and tracker.feed(delta):
+                                    break
                         except Exception:
                             # Ignore malformed lines
                             pass
@@ -193,9 +345,99 @@ class InferenceProvider:
             )
             self.model = model or os.getenv("LLAMA_MODEL", "llama3.1")
 
-    def generate(self, prompt: str) -> str:
-        return self.provider.generate(prompt, self.model)
+    def generate(
+        self,
+        prompt: str,
+        expect_json: bool = False,
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        return self.provider.generate(
+            prompt, self.model, expect_json=expect_json, max_tokens=max_tokens, json_schema=json_schema
+        )
+
+
+
+class PromptCache:
+    """On-disk cache of parsed LLM answers, keyed by model and prompt.
+
+    Each entry is one small JSON file named by a blake2b digest, written to a
+    temp file and renamed so a crash never leaves a truncated entry. Unreadable
+    or missing entries are treated as misses; write failures are ignored.
+    Entries older than max_age_seconds are misses. Writes keep a running
+    count of entries, and once it passes max_entries the oldest are removed
+    down to 90% of it, so the directory is listed once per many writes.
+    """
 
+    MAX_AGE_SECONDS = 30 * 24 * 3600
+    MAX_ENTRIES = 10000
+
+    def __init__(
+        self,
+        directory: Path,
+        model: Any = "",
+        max_age_seconds: float = MAX_AGE_SECONDS,
+        max_entries: int = MAX_ENTRIES,
+    ) -> None:
+        self.directory = directory
+        # Mocked providers may not have a string model name
+        self.model = model if isinstance(model, str) else ""
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        # Entries on disk, as of the last listing plus writes since (overwrites
+        # count too, which only brings the next listing forward); None until the
+        # first write lists the directory
+        self._entries: Optional[int] = None
+
+    def path_for(self, prompt: str) -> Path:
+        key = hashlib.blake2b(f"{self.model}\0{prompt}".encode("utf-8"), digest_size=16).hexdigest()
+        return self.directory / f"{key}.json"
+
+    def get(self, prompt: str) -> Any:
+        """Cached value for prompt, or None."""
+        try:
+            with open(self.path_for(prompt), "r", encoding="utf-8") as f:
+                if time.time() - os.fstat(f.fileno()).st_mtime > self.max_age_seconds:
+                    return None
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, prompt: str, value: Any) -> None:
+        path = self.path_for(prompt)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            if self._entries is not None:
+                self._entries += 1
+            if self._entries is None or self._entries > self.max_entries:
+                self._entries = self._prune()
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def _prune(self) -> int:
+        """Count the entries; past max_entries, remove the least recently written
+        down to 90% of it. Returns the number left."""
+        with os.scandir(self.directory) as it:
+            entries = [e for e in it if e.name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return len(entries)
+        keep = self.max_entries - self.max_entries // 10
+        entries.sort(key=lambda e: e.stat().st_mtime_ns)
+        for entry in entries[: len(entries) - keep]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+        return keep
+
+
+def cache_dir_from_env(env_var: str, name: str) -> Path:
+    """env_var if set, else ~/.cache/whats-that-sound/<name>."""
+    return Path(os.getenv(env_var) or Path.home() / ".cache" / "whats-that-sound" / name)
 
 
 def build_provider_from_env() -> InferenceProvider:
@@ -8,43 +8,123 @@ from __future__ import annotations
 import json
 import os
 import sqlite3
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 
 DEFAULT_DB = os.getenv("WTS_DB_PATH", str(Path.cwd() / "whats_that_sound.db"))
 
+# UPDATE ... RETURNING needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
 
-from .models import Job  # type: ignore
-from .migrations import ensure_schema  # type: ignore
+
+from .models import Job, JobSnapshot  # type: ignore
+from .migrations import ensure_schema, ACTIVE_STATUSES, ACTIVE_STATUS_SQL  # type: ignore
+
+
+# Columns returned by recent_jobs, in SELECT order; also the keys of each returned dict
+RECENT_JOB_FIELDS = ("id", "folder_path", "status", "job_type", "error", "created_at", "updated_at")
+
+
+# Database files (device, inode) whose schema this process has already ensured,
+# for the life of the process. Writes and checkpoints keep the inode; a deleted
+# and recreated file gets a new one and is checked again
+_SCHEMA_READY: Set[Tuple[int, int]] = set()
+_SCHEMA_LOCK = threading.Lock()
+
+
+def _file_id(db_path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(db_path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
 
 
 class SQLiteJobStore:
     def __init__(self, db_path: str = DEFAULT_DB) -> None:
         self.db_path = db_path
-        self._ensure_schema()
+        # One long-lived connection per thread (and per process, after a fork)
+        self._local = threading.local()
+        # Every connection opened, with its process id, so close() can reach
+        # the ones held by other threads (e.g. a server's request threads)
+        self._connections: List[Tuple[int, sqlite3.Connection]] = []
+        self._connections_lock = threading.Lock()
+        # Stores are created per worker and per processor; only the first one
+        # for a database file connects here and runs the schema check
+        if _file_id(db_path) not in _SCHEMA_READY:
+            self._ensure_schema()
         # fresh DB only; no legacy migrations
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        """This thread's connection, opened and configured on first use.
+
+        Callers use it as `with self._connect() as conn:`, which commits or
+        rolls back on exit but leaves the connection open for the next call.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        # Only the opening thread uses it; close() may run on another thread
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
         conn.execute("PRAGMA journal_mode=WAL;")
         conn.execute("PRAGMA synchronous=NORMAL;")
+        # Keep temp b-trees in memory, map the DB file, and allow a 64 MiB page cache
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        conn.execute("PRAGMA mmap_size=268435456;")
+        conn.execute("PRAGMA cache_size=-65536;")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        with self._connections_lock:
+            self._connections.append((os.getpid(), conn))
         return conn
 
+    def close(self) -> None:
+        """Close every connection this process opened on the store.
+
+        Call once the threads using the store are done with it; a later call
+        on any thread opens a fresh connection. Connections inherited across a
+        fork belong to the parent and are left alone.
+        """
+        pid = os.getpid()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for owner, conn in connections:
+            if owner == pid:
+                conn.close()
+
     def _ensure_schema(self) -> None:
-        with self._connect() as conn:
-            ensure_schema(conn)
+        with _SCHEMA_LOCK:
+            with self._connect() as conn:
+                ensure_schema(conn)
+            file_id = _file_id(self.db_path)
+            if file_id is not None:
+                _SCHEMA_READY.add(file_id)
 
     # legacy migration removed
 
     def enqueue(self, folder: Path, metadata: Dict[str, Any], user_feedback: Optional[str] = None, artist_hint: Optional[str] = None, job_type: str = "analyze") -> int:
+        """Insert a queued job, returning its id.
+
+        Idempotent: if the folder already has an active job (enforced by
+        idx_jobs_unique_active), nothing is inserted and that job's id is returned.
+        Rows the schema rejects otherwise raise sqlite3.IntegrityError.
+        """
         with self._connect() as conn:
+            # The insert and the fallback lookup share one write transaction, so
+            # the active job that blocked the insert cannot finish in between.
+            # ON CONFLICT only skips unique-index conflicts, unlike OR IGNORE,
+            # which would also drop CHECK and NOT NULL failures without a word
+            conn.execute("BEGIN IMMEDIATE;")
             cur = conn.execute(
                 """
                 INSERT INTO jobs(folder_path, metadata_json, user_feedback, artist_hint, job_type)
                 VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
                 """,
                 (
                     str(folder),
@@ -54,44 +134,137 @@ class SQLiteJobStore:
                     job_type,
                 ),
             )
-            return int(cur.lastrowid)
+            if cur.rowcount:
+                job_id = int(cur.lastrowid)
+            else:
+                row = conn.execute(
+                    f"SELECT id FROM jobs WHERE folder_path=? AND status IN {ACTIVE_STATUS_SQL} LIMIT 1",
+                    (str(folder),),
+                ).fetchone()
+                job_id = int(row[0])
+            conn.execute("COMMIT;")
+        return job_id
+
+    def enqueue_many(
+        self, rows: Iterable[Tuple[Path, Dict[str, Any], Optional[str], str]], skip_tracked: bool = False
+    ) -> int:
+        """Insert many jobs in a single transaction.
+
+        Each row is (folder, metadata, artist_hint, job_type). Rows for folders that
+        already have an active job are skipped by the unique index; with skip_tracked,
+        folders that have any job row at all are skipped too, checked inside the same
+        transaction. Returns number of rows actually inserted.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE;")
+            if skip_tracked:
+                tracked = _existing_folders(conn, [str(row[0]) for row in rows])
+                rows = [row for row in rows if str(row[0]) not in tracked]
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT INTO jobs(folder_path, metadata_json, artist_hint, job_type)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
+                """,
+                [
+                    (str(folder), json.dumps(metadata), artist_hint, job_type)
+                    for folder, metadata, artist_hint, job_type in rows
+                ],
+            )
+            inserted = conn.total_changes - before
+            conn.execute("COMMIT;")
+        return inserted
+
+    def existing_folders(self, folders: Iterable[Path]) -> Set[str]:
+        """Return the subset of folders (as strings) that have any job row."""
+        paths = [str(f) for f in folders]
+        if not paths:
+            return set()
+        with self._connect() as conn:
+            return _existing_folders(conn, paths)
+
+    def fetch_ready_for(self, folders: Iterable[Path]) -> Dict[str, Dict[str, Any]]:
+        """Latest ready result per folder for many folders, instead of get_result per folder.
+
+        Folders without a ready job are absent from the returned dict.
+        """
+        paths = [str(f) for f in folders]
+        results: Dict[str, Dict[str, Any]] = {}
+        if not paths:
+            return results
+        with self._connect() as conn:
+            # Chunk to stay well under SQLITE_MAX_VARIABLE_NUMBER
+            for i in range(0, len(paths), 500):
+                chunk = paths[i : i + 500]
+                q_marks = ",".join(["?"] * len(chunk))
+                # Oldest first, so the latest completion per folder wins below
+                rows = conn.execute(
+                    f"SELECT folder_path, result_json FROM jobs WHERE status='ready' AND folder_path IN ({q_marks}) ORDER BY completed_at",
+                    chunk,
+                ).fetchall()
+                for folder_path, result_json in rows:
+                    if not result_json:
+                        continue
+                    try:
+                        results[folder_path] = json.loads(result_json)
+                    except Exception:
+                        continue
+        return results
+
+    def folders_under(self, base: Path) -> Set[str]:
+        """Return every tracked folder_path at or below base, in one query."""
+        root = str(base)
+        prefix = root.rstrip(os.sep) + os.sep
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT folder_path FROM jobs WHERE folder_path=? OR substr(folder_path, 1, ?)=?",
+                (root, len(prefix), prefix),
+            ).fetchall()
+        return {r[0] for r in rows}
 
     def has_any_for_folder(self, folder: Path, statuses: Optional[List[str]] = None) -> bool:
-        # Default: consider all current statuses
-        statuses = statuses or [
-            "queued",
-            "analyzing",
-            "ready",
-            "accepted",
-            "moving",
-            "skipped",
-            "completed",
-            "error",
-        ]
+        # Default: any row at all (every status is allowed by the schema CHECK)
+        if not statuses:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT 1 FROM jobs WHERE folder_path=? LIMIT 1",
+                    (str(folder),),
+                ).fetchone()
+                return row is not None
         q_marks = ",".join(["?"] * len(statuses))
+        # Repeating the partial-index predicate lets SQLite probe the small
+        # idx_jobs_unique_active index instead of every historical row
+        active_filter = f" AND status IN {ACTIVE_STATUS_SQL}" if set(statuses) <= set(ACTIVE_STATUSES) else ""
         with self._connect() as conn:
             row = conn.execute(
-                f"SELECT 1 FROM jobs WHERE folder_path=? AND status IN ({q_marks}) LIMIT 1",
+                f"SELECT 1 FROM jobs WHERE folder_path=?{active_filter} AND status IN ({q_marks}) LIMIT 1",
                 (str(folder), *statuses),
             ).fetchone()
             return row is not None
 
     def claim_queued_for_analysis(self) -> Optional[Job]:
+        jobs = self.claim_queued_for_analysis_batch(1)
+        return jobs[0] if jobs else None
+
+    def claim_queued_for_analysis_batch(self, limit: int) -> List[Job]:
+        """Claim up to limit queued jobs, oldest first, in one transaction."""
         with self._connect() as conn:
             conn.execute("BEGIN IMMEDIATE;")
-            row = conn.execute(
-                "SELECT id, folder_path, metadata_json, user_feedback, artist_hint, status, job_type FROM jobs WHERE status='queued' ORDER BY id LIMIT 1"
-            ).fetchone()
-            if not row:
-                conn.execute("COMMIT;")
-                return None
-            job_id = row[0]
-            conn.execute(
-                "UPDATE jobs SET status='analyzing', started_at=CURRENT_TIMESTAMP, updated_at=CURRENT_TIMESTAMP WHERE id=?",
-                (job_id,),
-            )
+            rows = conn.execute(
+                "SELECT id, folder_path, metadata_json, user_feedback, artist_hint, status, job_type FROM jobs WHERE status='queued' ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE jobs SET status='analyzing', started_at=CURRENT_TIMESTAMP, updated_at=CURRENT_TIMESTAMP WHERE id=?",
+                    [(row[0],) for row in rows],
+                )
             conn.execute("COMMIT;")
-            return Job(*row)
+            return [Job(*row) for row in rows]
 
     def claim_accepted_for_move(self) -> Optional[Job]:
         with self._connect() as conn:
@@ -126,26 +299,11 @@ class SQLiteJobStore:
 
     def get_result(self, folder: Path) -> Optional[Dict[str, Any]]:
         with self._connect() as conn:
-            row = conn.execute(
-                "SELECT result_json FROM jobs WHERE folder_path=? AND status='ready' ORDER BY completed_at DESC LIMIT 1",
-                (str(folder),),
-            ).fetchone()
-            if not row or not row[0]:
-                return None
-            try:
-                return json.loads(row[0])
-            except Exception:
-                return None
+            return _get_result(conn, folder)
 
     def counts(self) -> Dict[str, int]:
         with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT status, COUNT(1) FROM jobs GROUP BY status"
-            ).fetchall()
-            result: Dict[str, int] = {"queued": 0, "analyzing": 0, "ready": 0, "accepted": 0, "moving": 0, "skipped": 0, "completed": 0, "error": 0}
-            for status, count in rows:
-                result[status] = int(count)
-            return result
+            return _counts(conn)
 
     def reset_stale_analyzing(self, max_age_seconds: int = 300) -> int:
         """Re-queue analyzing jobs that are likely orphaned.
@@ -166,15 +324,35 @@ class SQLiteJobStore:
 
     # No legacy alias
 
+    def data_version(self) -> int:
+        """PRAGMA data_version for this thread's connection.
+
+        It changes whenever another connection (any thread or process) commits
+        to the database, so pollers can skip queries while it holds still.
+        """
+        with self._connect() as conn:
+            return conn.execute("PRAGMA data_version;").fetchone()[0]
+
     def wait_for_result(self, folder: Path, timeout: float = 10.0, poll_interval: float = 0.25) -> Optional[Dict[str, Any]]:
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            res = self.get_result(folder)
-            if res is not None:
-                return res
-            time.sleep(poll_interval)
-        return None
+        """Block until folder has a ready proposal, or timeout seconds pass.
 
+        Workers live in other processes, so there is nothing to wait on but the
+        database. One connection is held for the whole wait, and the result query
+        only re-runs when PRAGMA data_version shows another connection committed.
+        """
+        deadline = time.time() + timeout
+        with self._connect() as conn:
+            seen_version = None
+            while True:
+                version = conn.execute("PRAGMA data_version;").fetchone()[0]
+                if version != seen_version:
+                    seen_version = version
+                    res = _get_result(conn, folder)
+                    if res is not None:
+                        return res
+                if time.time() >= deadline:
+                    return None
+                time.sleep(poll_interval)
 
     def fetch_ready(self, limit: int = 10) -> List[Tuple[int, str, Dict[str, Any]]]:
         """Fetch recently ready jobs (ready for decision).
@@ -182,18 +360,7 @@ class SQLiteJobStore:
         Returns list of (job_id, folder_path, result_dict)
         """
         with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT id, folder_path, result_json FROM jobs WHERE status='ready' ORDER BY completed_at DESC LIMIT ?",
-                (limit,),
-            ).fetchall()
-            out: List[Tuple[int, str, Dict[str, Any]]] = []
-            for job_id, folder_path, result_json in rows:
-                try:
-                    result = json.loads(result_json) if result_json else {}
-                except Exception:
-                    result = {}
-                out.append((int(job_id), folder_path, result))
-            return out
+            return _fetch_ready(conn, limit)
 
     def delete_job(self, job_id: int) -> None:
         with self._connect() as conn:
@@ -204,8 +371,11 @@ class SQLiteJobStore:
     def requeue_for_reconsideration(self, folder: Path, metadata: Dict[str, Any], user_feedback: Optional[str] = None) -> Optional[int]:
         """Reset the latest job for a folder back to queued with updated metadata/feedback.
 
+        The stored metadata is marked "reconsider" so the analyze worker asks
+        the LLM again instead of reusing cached answers for the same prompt.
         Returns the job id if updated, else None.
         """
+        metadata = {**metadata, "reconsider": True}
         with self._connect() as conn:
             row = conn.execute(
                 "SELECT id FROM jobs WHERE folder_path=? ORDER BY id DESC LIMIT 1",
@@ -236,18 +406,22 @@ class SQLiteJobStore:
 
         Returns the job id if updated, else None.
         """
+        if from_statuses:
+            q_marks = ",".join(["?"] * len(from_statuses))
+            latest = f"SELECT id FROM jobs WHERE folder_path=? AND status IN ({q_marks}) ORDER BY id DESC LIMIT 1"
+            params = (str(folder), *from_statuses)
+        else:
+            latest = "SELECT id FROM jobs WHERE folder_path=? ORDER BY id DESC LIMIT 1"
+            params = (str(folder),)
         with self._connect() as conn:
-            if from_statuses:
-                q_marks = ",".join(["?"] * len(from_statuses))
+            if _HAS_RETURNING:
+                # Find and update the row in one statement instead of a lookup then a write
                 row = conn.execute(
-                    f"SELECT id FROM jobs WHERE folder_path=? AND status IN ({q_marks}) ORDER BY id DESC LIMIT 1",
-                    (str(folder), *from_statuses),
-                ).fetchone()
-            else:
-                row = conn.execute(
-                    "SELECT id FROM jobs WHERE folder_path=? ORDER BY id DESC LIMIT 1",
-                    (str(folder),),
+                    f"UPDATE jobs SET status=?, updated_at=CURRENT_TIMESTAMP WHERE id=({latest}) RETURNING id",
+                    (to_status, *params),
                 ).fetchone()
+                return int(row[0]) if row else None
+            row = conn.execute(latest, params).fetchone()
             if not row:
                 return None
             job_id = int(row[0])
@@ -259,30 +433,93 @@ class SQLiteJobStore:
 
     def recent_jobs(self, limit: int = 100, statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         with self._connect() as conn:
-            if statuses:
-                q_marks = ",".join(["?"] * len(statuses))
-                rows = conn.execute(
-                    f"SELECT id, folder_path, status, job_type, error, created_at, updated_at FROM jobs WHERE status IN ({q_marks}) ORDER BY updated_at DESC, id DESC LIMIT ?",
-                    (*statuses, limit),
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT id, folder_path, status, job_type, error, created_at, updated_at FROM jobs ORDER BY updated_at DESC, id DESC LIMIT ?",
-                    (limit,),
-                ).fetchall()
-            out: List[Dict[str, Any]] = []
-            for row in rows:
-                out.append(
-                    {
-                        "id": int(row[0]),
-                        "folder_path": row[1],
-                        "status": row[2],
-                        "job_type": row[3],
-                        "error": row[4],
-                        "created_at": row[5],
-                        "updated_at": row[6],
-                    }
+            return _recent_jobs(conn, limit, statuses)
+
+    def snapshot(
+        self, ready_limit: int = 0, recent_limit: int = 0, recent_statuses: Optional[List[str]] = None
+    ) -> JobSnapshot:
+        """Counts plus optional ready and recent job lists from one connection.
+
+        The reads share a single transaction, so a status poll opens one
+        connection and sees one consistent view instead of two or three.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN;")
+            try:
+                return JobSnapshot(
+                    counts=_counts(conn),
+                    ready=_fetch_ready(conn, ready_limit) if ready_limit > 0 else [],
+                    recent=_recent_jobs(conn, recent_limit, recent_statuses) if recent_limit > 0 else [],
                 )
-            return out
+            finally:
+                conn.execute("COMMIT;")
+
+
+def _existing_folders(conn: sqlite3.Connection, paths: List[str]) -> Set[str]:
+    found: Set[str] = set()
+    # Chunk to stay well under SQLITE_MAX_VARIABLE_NUMBER
+    for i in range(0, len(paths), 500):
+        chunk = paths[i : i + 500]
+        q_marks = ",".join(["?"] * len(chunk))
+        rows = conn.execute(
+            f"SELECT DISTINCT folder_path FROM jobs WHERE folder_path IN ({q_marks})",
+            chunk,
+        ).fetchall()
+        found.update(r[0] for r in rows)
+    return found
+
+
+def _get_result(conn: sqlite3.Connection, folder: Path) -> Optional[Dict[str, Any]]:
+    row = conn.execute(
+        "SELECT result_json FROM jobs WHERE folder_path=? AND status='ready' ORDER BY completed_at DESC LIMIT 1",
+        (str(folder),),
+    ).fetchone()
+    if not row or not row[0]:
+        return None
+    try:
+        return json.loads(row[0])
+    except Exception:
+        return None
 
 
+def _counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    rows = conn.execute(
+        "SELECT status, COUNT(1) FROM jobs GROUP BY status"
+    ).fetchall()
+    result: Dict[str, int] = {"queued": 0, "analyzing": 0, "ready": 0, "accepted": 0, "moving": 0, "skipped": 0, "completed": 0, "error": 0}
+    for status, count in rows:
+        result[status] = int(count)
+    return result
+
+
+def _fetch_ready(conn: sqlite3.Connection, limit: int) -> List[Tuple[int, str, Dict[str, Any]]]:
+    rows = conn.execute(
+        "SELECT id, folder_path, result_json FROM jobs WHERE status='ready' ORDER BY completed_at DESC LIMIT ?",
+        (limit,),
+    ).fetchall()
+    out: List[Tuple[int, str, Dict[str, Any]]] = []
+    for job_id, folder_path, result_json in rows:
+        try:
+            result = json.loads(result_json) if result_json else {}
+        except Exception:
+            result = {}
+        out.append((int(job_id), folder_path, result))
+    return out
+
+
+def _recent_jobs(conn: sqlite3.Connection, limit: int, statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    columns = ", ".join(RECENT_JOB_FIELDS)
+    if statuses:
+        q_marks = ",".join(["?"] * len(statuses))
+        rows = conn.execute(
+            f"SELECT {columns} FROM jobs WHERE status IN ({q_marks}) ORDER BY updated_at DESC, id DESC LIMIT ?",
+            (*statuses, limit),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            f"SELECT {columns} FROM jobs ORDER BY updated_at DESC, id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    # Column order matches the field names, so each row maps straight onto its dict
+    # (id is an INTEGER PRIMARY KEY, already an int)
+    return [dict(zip(RECENT_JOB_FIELDS, row)) for row in rows]
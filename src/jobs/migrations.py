@@ -1,6 +1,12 @@
 import sqlite3
 
 
+# Statuses covered by the partial unique index; queries must repeat this exact
+# predicate for SQLite to choose the partial index.
+ACTIVE_STATUSES = ("queued", "analyzing", "ready", "accepted", "moving")
+ACTIVE_STATUS_SQL = "(" + ",".join(f"'{s}'" for s in ACTIVE_STATUSES) + ")"
+
+
 def ensure_schema(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
@@ -21,12 +27,15 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         );
         """
     )
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);")
+    # (status, completed_at) serves the per-status counts and hands the ready list
+    # back already in completion order; it makes the status-only index redundant
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_completed ON jobs(status, completed_at);")
+    conn.execute("DROP INDEX IF EXISTS idx_jobs_status;")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_folder ON jobs(folder_path);")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_type ON jobs(job_type);")
     # Prevent duplicate active jobs for same folder (allow multiple historical completed/skipped/error)
     conn.execute(
-        "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_unique_active ON jobs(folder_path) WHERE status IN ('queued','analyzing','ready','accepted','moving');"
+        f"CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_unique_active ON jobs(folder_path) WHERE status IN {ACTIVE_STATUS_SQL};"
     )
 
 
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
 
 
 @dataclass
@@ -12,3 +13,10 @@ class Job:
     job_type: str
 
 
+@dataclass
+class JobSnapshot:
+    """Job counts by status plus the ready and recent lists read alongside them."""
+
+    counts: Dict[str, int]
+    ready: List[Tuple[int, str, Dict[str, Any]]] = field(default_factory=list)
+    recent: List[Dict[str, Any]] = field(default_factory=list)
@@ -1,141 +1,270 @@
 from pathlib import Path
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import logging
 
 from ..metadata import MetadataExtractor  # type: ignore
+from ..trackers.state_manager import TRACKER_FILENAME  # type: ignore
 
 from . import SQLiteJobStore  # type: ignore circular import
 
 
 logger = logging.getLogger("wts.jobs.scanner")
 
+# Folder names like "CD1", "Disc 2", "disk_a", "Vol. 3", "Volume II"
+_DISC_RE = re.compile(r"cd|disc|disk|vol", re.IGNORECASE)
+
+# One analyze job as (folder, metadata, artist_hint, job_type), the row shape enqueue_many takes
+ScanDecision = Tuple[Path, Dict[str, Any], Optional[str], str]
+
+# Flush buffered enqueues to SQLite in transactions of at most this many rows
+ENQUEUE_BATCH_SIZE = 500
+
 
 def enqueue_scan_jobs(jobstore: SQLiteJobStore, root: Path) -> None:
     """Enqueue a single scan job for the given root directory."""
     jobstore.enqueue(root, {"type": "scan", "root": str(root)}, job_type="scan")
 
 
-IGNORE_DIR_NAMES = {
-    "scans",
-    "scan",
-    "artwork",
-    "covers",
-    "cover",
-    "booklet",
-    "extras",
-    "logs",
-    "log",
-}
+IGNORE_DIR_NAMES = frozenset(
+    {
+        "scans",
+        "scan",
+        "artwork",
+        "covers",
+        "cover",
+        "booklet",
+        "extras",
+        "logs",
+        "log",
+    }
+)
+
+
+def _should_skip_dir(name_lower: str) -> bool:
+    """True for artwork/scan/log style folders; expects an already-lowercased name."""
+    return name_lower in IGNORE_DIR_NAMES
 
 
-def _dir_has_music_anywhere(dir_path: Path) -> bool:
-    for root, _dirs, files in os.walk(dir_path, topdown=True, onerror=lambda e: None):
+def _dir_has_music_anywhere(dir_path: Path, cache: Optional[Dict[str, bool]] = None) -> bool:
+    """Return True if any music file exists below dir_path (ignored dirs pruned).
+
+    When a cache dict is given, results are memoized by path so a single scan
+    never walks the same subtree twice.
+    """
+    key = str(dir_path)
+    if cache is not None and key in cache:
+        return cache[key]
+    found = False
+    is_music = MetadataExtractor.is_music_name
+    for _, dirs, files in os.walk(dir_path, topdown=True, onerror=lambda e: None):
         # prune ignored directories
-        _dirs[:] = [d for d in _dirs if d.lower() not in IGNORE_DIR_NAMES]
-        for name in files:
-            if Path(name).suffix.lower() in MetadataExtractor.SUPPORTED_FORMATS:
-                return True
-    return False
+        dirs[:] = [d for d in dirs if not _should_skip_dir(d.lower())]
+        if any(is_music(name) for name in files):
+            found = True
+            break
+    if cache is not None:
+        cache[key] = found
+    return found
 
 
-def _dir_has_music_direct(dir_path: Path) -> bool:
-    for entry in dir_path.iterdir():
-        if entry.is_file() and entry.suffix.lower() in MetadataExtractor.SUPPORTED_FORMATS:
-            return True
-    return False
+def _count_music_up_to(dir_path: Path, limit: int) -> int:
+    """Count music files below dir_path, stopping early once limit is reached."""
+    count = 0
+    is_music = MetadataExtractor.is_music_name
+    try:
+        for _, _, files in os.walk(dir_path, topdown=True, onerror=lambda e: None):
+            for name in files:
+                if is_music(name):
+                    count += 1
+                    if count >= limit:
+                        return count
+    except Exception:
+        pass
+    return count
 
 
 def _looks_like_disc_folder(name: str) -> bool:
-    lowered = name.lower()
-    if lowered in IGNORE_DIR_NAMES:
+    if _should_skip_dir(name.lower()):
         return False
-    return (
-        lowered.startswith("cd")
-        or lowered.startswith("disc")
-        or lowered.startswith("disk")
-        or lowered.startswith("vol")
-        or lowered.startswith("volume")
-    )
+    return _DISC_RE.match(name) is not None
 
 
-def perform_scan(jobstore: SQLiteJobStore, base: Path) -> None:
-    """Scan base for albums and enqueue analyze jobs.
+def _scan_threads() -> int:
+    """Worker threads for inspecting top-level folders (WTS_SCAN_THREADS)."""
+    try:
+        return max(1, int(os.getenv("WTS_SCAN_THREADS", "8")))
+    except ValueError:
+        return 8
 
-    Rules:
-    - If a child folder has music files directly, enqueue that folder (album).
-    - If a child folder has no direct music but contains disc-like subdirs (cd1/cd2), enqueue the child (multi-disc album).
-    - Else, if a child folder has subfolders with music, treat it as an artist collection and enqueue each album subfolder with artist_hint=child.name.
+
+def _probe_top_level(
+    artist_or_album: Path, tracked: Set[str], has_music_cache: Dict[str, bool]
+) -> List[Tuple[Path, Optional[str]]]:
+    """Decide which folders under one top-level folder become analyze jobs.
+
+    Returns (folder, artist_hint) pairs and only reads tracked, so it can run
+    on a pool thread while the caller records and enqueues the results.
     """
-    for artist_or_album in sorted([p for p in base.iterdir() if p.is_dir()]):
-        try:
-            logger.info(f"Scanning {artist_or_album}")
-            # Already tracked?
-            if jobstore.has_any_for_folder(artist_or_album):
-                logger.info(f"Already tracked {artist_or_album}")
-                continue
+    found: List[Tuple[Path, Optional[str]]] = []
+    is_music = MetadataExtractor.is_music_name
+    try:
+        # Per-folder records are debug-level and formatted lazily; perform_scan
+        # logs one summary, instead of several formatted records per folder
+        logger.debug("Scanning %s", artist_or_album)
+        # Already tracked?
+        if str(artist_or_album) in tracked:
+            logger.debug("Already tracked %s", artist_or_album)
+            return found
 
-            # Inspect subdirectories and direct music presence
-            subdirs = [d for d in artist_or_album.iterdir() if d.is_dir() and d.name.lower() not in IGNORE_DIR_NAMES]
-            direct_music = _dir_has_music_direct(artist_or_album)
-            # Multi-disc heuristic (stricter + mixed case handling)
-            if subdirs:
-                disc_like = [d for d in subdirs if _looks_like_disc_folder(d.name)]
-                disc_like_count = len(disc_like)
-                if direct_music and disc_like_count >= 1:
-                    # If root has more tracks than combined disc subfolders, treat as single album
-                    root_tracks = 0
-                    try:
-                        for entry in artist_or_album.iterdir():
-                            if entry.is_file() and entry.suffix.lower() in MetadataExtractor.SUPPORTED_FORMATS:
-                                root_tracks += 1
-                    except Exception:
-                        pass
+        # Inspect subdirectories, direct music files and the organized-tracker
+        # file in one listing, rather than probing the tracker with its own stat
+        subdirs = []
+        root_tracks = 0
+        organized = False
+        with os.scandir(artist_or_album) as it:
+            for e in it:
+                if e.is_dir():
+                    if not _should_skip_dir(e.name.lower()):
+                        subdirs.append(Path(e.path))
+                elif is_music(e.name) and e.is_file():
+                    root_tracks += 1
+                elif e.name == TRACKER_FILENAME:
+                    organized = True
+        if organized:
+            logger.debug("Already organized %s", artist_or_album)
+            return found
+        direct_music = root_tracks > 0
+        # Classify each subdir once; every disc-like check below derives from these flags
+        disc_flags = [_looks_like_disc_folder(d.name) for d in subdirs]
+        disc_like = [d for d, is_disc in zip(subdirs, disc_flags) if is_disc]
+        disc_like_count = len(disc_like)
+        # Multi-disc heuristic (stricter + mixed case handling)
+        if subdirs:
+            if direct_music and disc_like_count >= 1:
+                # If root has more tracks than combined disc subfolders, treat as single album.
+                # Disc subfolders dominate only if they hold more tracks than the root, so
+                # stop counting at root_tracks + 1 and skip counting when too few discs.
+                discs_dominate = False
+                if disc_like_count >= 2 and disc_like_count >= max(2, int(0.5 * len(subdirs))):
+                    limit = root_tracks + 1
                     disc_tracks = 0
                     for d in disc_like:
-                        try:
-                            for _r, _ds, files in os.walk(d, topdown=True, onerror=lambda e: None):
-                                for name in files:
-                                    if Path(name).suffix.lower() in MetadataExtractor.SUPPORTED_FORMATS:
-                                        disc_tracks += 1
-                        except Exception:
+                        disc_tracks += _count_music_up_to(d, limit - disc_tracks)
+                        if disc_tracks >= limit:
+                            discs_dominate = True
+                            break
+                # If disc subfolders clearly dominate and there are at least 2 disc-like subdirs,
+                # enqueue each disc folder (not the parent) to capture all files explicitly
+                if discs_dominate:
+                    for d in sorted(disc_like):
+                        if str(d) in tracked:
                             continue
-                    # If disc subfolders clearly dominate and there are at least 2 disc-like subdirs,
-                    # enqueue each disc folder (not the parent) to capture all files explicitly
-                    if disc_like_count >= 2 and disc_tracks > root_tracks and disc_like_count >= max(2, int(0.5 * len(subdirs))):
-                        for d in sorted(disc_like):
-                            if jobstore.has_any_for_folder(d):
-                                continue
-                            jobstore.enqueue(d, {"folder_name": d.name}, artist_hint=artist_or_album.name, job_type="analyze")
-                        continue
-                    # Otherwise favor the parent as a single album (root tracks dominate or not enough disc-like subdirs)
-                    jobstore.enqueue(artist_or_album, {"folder_name": artist_or_album.name}, job_type="analyze")
-                    continue
-                elif not direct_music and disc_like_count >= 2 and disc_like_count >= max(1, int(0.5 * len(subdirs))):
-                    jobstore.enqueue(artist_or_album, {"folder_name": artist_or_album.name}, job_type="analyze")
-                    continue
-
-            # If there is direct music and no disc-like pattern, treat as single album at parent
-            if direct_music and (not subdirs or all(not _looks_like_disc_folder(d.name) for d in subdirs)):
-                jobstore.enqueue(artist_or_album, {"folder_name": artist_or_album.name}, job_type="analyze")
+                        found.append((d, artist_or_album.name))
+                    return found
+                # Otherwise favor the parent as a single album (root tracks dominate or not enough disc-like subdirs)
+                found.append((artist_or_album, None))
+                return found
+            elif not direct_music and disc_like_count >= 2 and disc_like_count >= max(1, int(0.5 * len(subdirs))):
+                found.append((artist_or_album, None))
+                return found
+
+        # If there is direct music and no disc-like pattern, treat as single album at parent
+        if direct_music and disc_like_count == 0:
+            found.append((artist_or_album, None))
+            return found
+
+        logger.debug("Enqueuing %s as artist collection", artist_or_album)
+        # Artist collection heuristic: enqueue each subdir that contains music
+        for album_dir in sorted(subdirs):
+            if not _dir_has_music_anywhere(album_dir, has_music_cache):
                 continue
+            if str(album_dir) in tracked:
+                continue
+            found.append((album_dir, artist_or_album.name))
+
+        # If none enqueued but there is music somewhere below, enqueue the parent.
+        # No direct music reaches this point, so the per-album results already answer it.
+        if not found and any(has_music_cache[str(album_dir)] for album_dir in subdirs):
+            found.append((artist_or_album, None))
+    except Exception:
+        # Ignore problematic directories and continue
+        pass
+    return found
+
+
+def iter_scan_decisions(base: Path, tracked: Optional[Set[str]] = None) -> Iterator[ScanDecision]:
+    """Walk base and yield an analyze-job row for each album folder, as it is found.
+
+    Rules:
+    - If a child folder has music files directly, enqueue that folder (album).
+    - If a child folder has no direct music but contains disc-like subdirs (cd1/cd2), enqueue the child (multi-disc album).
+    - Else, if a child folder has subfolders with music, treat it as an artist collection and enqueue each album subfolder with artist_hint=child.name.
 
-            logger.info(f"Enqueuing {artist_or_album} as artist collection")
-            # Artist collection heuristic: enqueue each subdir that contains music
-            enqueued_any = False
-            for album_dir in sorted(subdirs):
-                if not _dir_has_music_anywhere(album_dir):
-                    continue
-                if jobstore.has_any_for_folder(album_dir):
-                    continue
-                jobstore.enqueue(album_dir, {"folder_name": album_dir.name}, artist_hint=artist_or_album.name, job_type="analyze")
-                enqueued_any = True
-
-            # If none enqueued but there is music somewhere below, enqueue the parent
-            if not enqueued_any and _dir_has_music_anywhere(artist_or_album):
-                jobstore.enqueue(artist_or_album, {"folder_name": artist_or_album.name}, job_type="analyze")
-        except Exception:
-            # Ignore problematic directories and continue
-            continue
+    Top-level folders are inspected concurrently on a thread pool (the work is
+    directory listings, which release the GIL), starting while base is still
+    being listed; rows are still yielded in sorted order on the calling thread. Folders already in tracked are
+    skipped; every yielded folder is added to it.
+    """
+    tracked = set() if tracked is None else tracked
+    # Per-scan memo of music presence, keyed by path, so no subtree is walked twice.
+    # Top-level folders never share subtrees, so pool threads never race on a key.
+    has_music_cache: Dict[str, bool] = {}
+
+    def probe(folder: Path) -> List[Tuple[Path, Optional[str]]]:
+        return _probe_top_level(folder, tracked, has_music_cache)
+
+    threads = _scan_threads()
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wts-scan") if threads > 1 else None
+    try:
+        # Each folder is submitted as the listing reaches it, so probing overlaps
+        # reading a large base directory instead of waiting for all of it
+        with os.scandir(base) as it:
+            if pool:
+                futures = {e.path: pool.submit(probe, Path(e.path)) for e in it if e.is_dir()}
+                top_level = sorted(futures)
+            else:
+                futures = {}
+                top_level = sorted(e.path for e in it if e.is_dir())
+        for path in top_level:
+            found = futures[path].result() if pool else probe(Path(path))
+            for folder, artist_hint in found:
+                tracked.add(str(folder))
+                yield (folder, {"folder_name": folder.name}, artist_hint, "analyze")
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+
+def perform_scan(jobstore: SQLiteJobStore, base: Path) -> None:
+    """Scan base for albums and enqueue analyze jobs (rules in iter_scan_decisions).
+
+    Decisions stream out of the walk and are written in batched transactions,
+    so the first albums are queued before the whole library has been walked.
+    """
+    # Everything already tracked below base, fetched once; kept current by the walk
+    tracked = jobstore.folders_under(base)
+    pending: List[ScanDecision] = []
+    queued = 0
+    skipped = 0
 
+    def flush() -> None:
+        nonlocal queued, skipped
+        batch = list(pending)
+        pending.clear()
+        # ON CONFLICT DO NOTHING: a concurrent scan that already queued a folder is not an error
+        added = jobstore.enqueue_many(batch)
+        queued += added
+        skipped += len(batch) - added
 
+    for decision in iter_scan_decisions(base, tracked):
+        pending.append(decision)
+        if len(pending) >= ENQUEUE_BATCH_SIZE:
+            flush()
+    flush()
+    logger.info(f"Scan of {base} queued {queued} folders")
+    if skipped:
+        logger.info(f"Skipped {skipped} folders already queued elsewhere")
@@ -1,23 +1,78 @@
 """Music metadata extraction utilities."""
 
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import os
-from typing import Dict, List, Optional, Any
+import re
+import threading
+from typing import Dict, FrozenSet, List, Optional, Any, Sequence, Tuple
 import mutagen
 from mutagen.id3 import ID3
 from mutagen.mp3 import MP3
 from mutagen.flac import FLAC
 from mutagen.mp4 import MP4
 from mutagen.oggvorbis import OggVorbis
+from mutagen.oggopus import OggOpus
+
+
+# Tag names per field, in ID3 / Vorbis comment / MP4 atom order
+_TAG_KEYS = (
+    ("title", ("TIT2", "TITLE", "\xa9nam")),
+    ("artist", ("TPE1", "ARTIST", "\xa9ART")),
+    ("album", ("TALB", "ALBUM", "\xa9alb")),
+    ("date", ("TDRC", "DATE", "\xa9day")),
+    ("track", ("TRCK", "TRACKNUMBER", "trkn")),
+    ("genre", ("TCON", "GENRE", "\xa9gen")),
+    ("albumartist", ("TPE2", "ALBUMARTIST", "aART")),
+)
+
+
+def _metadata_threads() -> int:
+    """Tag-reading threads per folder: WTS_METADATA_THREADS, else min(8, CPU count).
+
+    Lower it for libraries on spinning disks or network shares, where many
+    concurrent readers seek against each other.
+    """
+    try:
+        return max(1, int(os.environ["WTS_METADATA_THREADS"]))
+    except (KeyError, ValueError):
+        return min(8, os.cpu_count() or 4)
 
 
 class MetadataExtractor:
     """Extract metadata from music files."""
 
-    SUPPORTED_FORMATS = {".mp3", ".flac", ".m4a", ".mp4", ".ogg", ".opus", ".wav"}
+    SUPPORTED_FORMATS: FrozenSet[str] = frozenset(
+        {".mp3", ".flac", ".m4a", ".mp4", ".ogg", ".opus", ".wav"}
+    )
+    # Matches file names whose Path.suffix is supported, for bulk filtering without Path objects
+    SUPPORTED_RE = re.compile(
+        r"(?<=.)\.(?:" + "|".join(sorted(ext[1:] for ext in SUPPORTED_FORMATS)) + r")$",
+        re.IGNORECASE,
+    )
+    # SUPPORTED_FORMATS without the dots, for is_music_name
+    _SUPPORTED_EXTS: FrozenSet[str] = frozenset(ext[1:] for ext in SUPPORTED_FORMATS)
+
+    @staticmethod
+    def is_music_name(name: str) -> bool:
+        """True if a file name's Path.suffix is supported.
+
+        One rpartition and a set lookup; about twice as fast as SUPPORTED_RE,
+        whose end-anchored search still tries every position in the name.
+        """
+        head, _, ext = name.rpartition(".")
+        return bool(head) and ext.lower() in MetadataExtractor._SUPPORTED_EXTS
+
+    # Per-file tag results kept per extractor, most recently used last
+    TAG_CACHE_SIZE = 4096
 
     def __init__(self):
         """Initialize the metadata extractor."""
+        # (path, size, mtime_ns) -> tags; a retagged or replaced file has a new
+        # size or mtime and is read again. Files are extracted from pool threads
+        self._tag_cache: "OrderedDict[Tuple[str, int, int], Dict[str, Any]]" = OrderedDict()
+        self._tag_lock = threading.Lock()
         self.handlers = {
             ".mp3": self._extract_mp3,
             ".flac": self._extract_flac,
@@ -27,40 +82,73 @@ class MetadataExtractor:
             ".opus": self._extract_ogg,
         }
 
-    def extract_file_metadata(self, file_path: Path) -> Dict[str, Any]:
+    def extract_file_metadata(
+        self, file_path: Path, *, stat_result: Optional[os.stat_result] = None
+    ) -> Dict[str, Any]:
         """Extract metadata from a single music file.
 
         Args:
             file_path: Path to the music file
+            stat_result: Optional stat of file_path already obtained by the caller
 
         Returns:
             Dictionary containing metadata fields
         """
-        if not file_path.exists():
-            return {"error": "File not found"}
+        if stat_result is None:
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                return {"error": "File not found"}
 
         suffix = file_path.suffix.lower()
         if suffix not in self.SUPPORTED_FORMATS:
             return {"error": f"Unsupported format: {suffix}"}
 
+        key = (str(file_path), stat_result.st_size, stat_result.st_mtime_ns)
+        with self._tag_lock:
+            cached = self._tag_cache.get(key)
+            if cached is not None:
+                self._tag_cache.move_to_end(key)
+                # Copy: callers add keys such as relative_path
+                return dict(cached)
+
         try:
             handler = self.handlers.get(suffix, self._extract_generic)
             metadata = handler(file_path)
 
             # Add file information
             metadata["filename"] = file_path.name
-            metadata["file_size_mb"] = file_path.stat().st_size / (1024 * 1024)
+            metadata["file_size_mb"] = stat_result.st_size / (1024 * 1024)
             metadata["format"] = suffix[1:]  # Remove the dot
-
-            return metadata
         except Exception as e:
             return {"error": str(e), "filename": file_path.name}
 
-    def extract_folder_metadata(self, folder_path: Path) -> Dict[str, Any]:
+        if "error" not in metadata:
+            with self._tag_lock:
+                self._tag_cache[key] = dict(metadata)
+                while len(self._tag_cache) > self.TAG_CACHE_SIZE:
+                    self._tag_cache.popitem(last=False)
+        return metadata
+
+    def clear_cache(self) -> None:
+        """Forget every cached file's tags."""
+        with self._tag_lock:
+            self._tag_cache.clear()
+
+    def extract_folder_metadata(
+        self,
+        folder_path: Path,
+        file_paths: Optional[Sequence[str]] = None,
+        subdirectories: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
         """Extract metadata from all music files in a folder.
 
         Args:
             folder_path: Path to the folder
+            file_paths: Music files below folder_path when the caller has
+                already listed the tree; the folder is then not walked again
+            subdirectories: Names of folder_path's immediate subdirectories,
+                used together with file_paths
 
         Returns:
             Dictionary containing folder info and file metadata
@@ -68,30 +156,25 @@ class MetadataExtractor:
         if not folder_path.is_dir():
             return {"error": "Not a directory"}
 
-        # Get all music files recursively (case-insensitive by checking suffix)
-        music_files = []
-        try:
-            for root, _dirs, files in os.walk(folder_path, topdown=True, onerror=lambda e: None):
-                for name in files:
-                    suffix = Path(name).suffix.lower()
-                    if suffix in self.SUPPORTED_FORMATS:
-                        music_files.append(Path(root) / name)
-        except Exception:
-            # Fallback to Path.rglob if os.walk fails unexpectedly
-            music_files = [
-                p for p in folder_path.rglob("*") if p.is_file() and p.suffix.lower() in self.SUPPORTED_FORMATS
-            ]
+        music_files: List[Tuple[Path, Optional[os.stat_result]]]
+        if file_paths is not None:
+            # Stats are taken per file during extraction instead
+            music_files = [(Path(path), None) for path in file_paths]
+            subdirectories = list(subdirectories or [])
+        else:
+            music_files, subdirectories = self._walk_music_files(folder_path)
 
         # Sort by path for consistent ordering
-        music_files.sort()
+        music_files.sort(key=lambda item: item[0])
 
-        # Extract metadata from each file
-        files_metadata = []
-        for file_path in music_files:
-            relative_path = file_path.relative_to(folder_path)
-            metadata = self.extract_file_metadata(file_path)
-            metadata["relative_path"] = str(relative_path)
-            files_metadata.append(metadata)
+        # Extract metadata from each file; tag parsing is I/O bound, so overlap it
+        # across threads. map() keeps results in the sorted file order.
+        jobs = [(file_path, stat_result, folder_path) for file_path, stat_result in music_files]
+        if len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(jobs), _metadata_threads())) as executor:
+                files_metadata = list(executor.map(self._extract_one, jobs))
+        else:
+            files_metadata = [self._extract_one(job) for job in jobs]
 
         # Analyze common patterns
         analysis = self._analyze_metadata_patterns(files_metadata)
@@ -102,13 +185,65 @@ class MetadataExtractor:
             "total_files": len(music_files),
             "files": files_metadata,
             "analysis": analysis,
-            "subdirectories": [d.name for d in folder_path.iterdir() if d.is_dir()],
+            "subdirectories": subdirectories or [],
         }
 
-    def _extract_generic(self, file_path: Path) -> Dict[str, Any]:
-        """Generic metadata extraction using mutagen."""
+    def _walk_music_files(
+        self, folder_path: Path
+    ) -> Tuple[List[Tuple[Path, Optional[os.stat_result]]], List[str]]:
+        """Music files below folder_path with their stats, and its immediate subdirectories."""
+        # Get all music files recursively in a single scandir walk (case-insensitive by
+        # checking suffix), keeping each file's stat so it is not repeated per file.
+        # The first directory listed also yields the immediate subdirectories.
+        music_files: List[Tuple[Path, Optional[os.stat_result]]] = []
+        subdirectories: Optional[List[str]] = None
+        is_music = self.is_music_name
+        stack = [str(folder_path)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            dirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        dirs.append(entry.name)
+                        # Like os.walk, do not descend into symlinked directories
+                        if not entry.is_symlink():
+                            stack.append(entry.path)
+                    elif is_music(entry.name):
+                        music_files.append((Path(entry.path), entry.stat()))
+                except OSError:
+                    continue
+            if subdirectories is None:
+                subdirectories = dirs
+        return music_files, subdirectories or []
+
+    def _extract_one(
+        self, job: Tuple[Path, Optional[os.stat_result], Path]
+    ) -> Dict[str, Any]:
+        """Extract one file's metadata and tag it with its path relative to the folder."""
+        file_path, stat_result, folder_path = job
+        metadata = self.extract_file_metadata(file_path, stat_result=stat_result)
+        metadata["relative_path"] = str(file_path.relative_to(folder_path))
+        return metadata
+
+    def _extract_generic(
+        self, file_path: Path, kinds: Sequence[type] = ()
+    ) -> Dict[str, Any]:
+        """Generic metadata extraction using mutagen.
+
+        When kinds is given, mutagen only scores those file types instead of
+        sniffing every format it knows; it falls back to full detection if the
+        file does not match them.
+        """
         try:
-            audio = mutagen.File(file_path)
+            audio = mutagen.File(file_path, options=list(kinds)) if kinds else None
+            if audio is None:
+                audio = mutagen.File(file_path)
             if audio is None:
                 return {"error": "Could not read file"}
 
@@ -122,29 +257,10 @@ class MetadataExtractor:
             }
 
             # Extract common tags
-            if audio.tags:
+            tags = audio.tags
+            if tags:
                 metadata.update(
-                    {
-                        "title": self._get_tag(
-                            audio.tags, ["TIT2", "TITLE", "\xa9nam"]
-                        ),
-                        "artist": self._get_tag(
-                            audio.tags, ["TPE1", "ARTIST", "\xa9ART"]
-                        ),
-                        "album": self._get_tag(
-                            audio.tags, ["TALB", "ALBUM", "\xa9alb"]
-                        ),
-                        "date": self._get_tag(audio.tags, ["TDRC", "DATE", "\xa9day"]),
-                        "track": self._get_tag(
-                            audio.tags, ["TRCK", "TRACKNUMBER", "trkn"]
-                        ),
-                        "genre": self._get_tag(
-                            audio.tags, ["TCON", "GENRE", "\xa9gen"]
-                        ),
-                        "albumartist": self._get_tag(
-                            audio.tags, ["TPE2", "ALBUMARTIST", "aART"]
-                        ),
-                    }
+                    {field: self._get_tag(tags, keys) for field, keys in _TAG_KEYS}
                 )
 
             return metadata
@@ -153,29 +269,29 @@ class MetadataExtractor:
 
     def _extract_mp3(self, file_path: Path) -> Dict[str, Any]:
         """Extract metadata from MP3 files."""
-        return self._extract_generic(file_path)
+        return self._extract_generic(file_path, (MP3,))
 
     def _extract_flac(self, file_path: Path) -> Dict[str, Any]:
         """Extract metadata from FLAC files."""
-        return self._extract_generic(file_path)
+        return self._extract_generic(file_path, (FLAC,))
 
     def _extract_mp4(self, file_path: Path) -> Dict[str, Any]:
         """Extract metadata from MP4/M4A files."""
-        return self._extract_generic(file_path)
+        return self._extract_generic(file_path, (MP4,))
 
     def _extract_ogg(self, file_path: Path) -> Dict[str, Any]:
         """Extract metadata from OGG files."""
-        return self._extract_generic(file_path)
+        return self._extract_generic(file_path, (OggVorbis, OggOpus))
 
-    def _get_tag(self, tags: Any, keys: List[str]) -> Optional[str]:
+    def _get_tag(self, tags: Any, keys: Sequence[str]) -> Optional[str]:
         """Get the first available tag from a list of possible keys."""
+        get = tags.get
         for key in keys:
-            if key in tags:
-                value = tags[key]
-                if isinstance(value, list) and value:
-                    return str(value[0])
-                elif value:
-                    return str(value)
+            value = get(key)
+            if not value:
+                continue
+            # mutagen returns lists for Vorbis/MP4 tags; plain strings must not be indexed
+            return str(value[0]) if isinstance(value, list) else str(value)
         return None
 
     def _analyze_metadata_patterns(
@@ -191,57 +307,56 @@ class MetadataExtractor:
             "folder_structure_hints": [],
         }
 
-        # Count occurrences
-        artists = {}
-        albums = {}
-        years = {}
+        # Count occurrences and collect track numbers in a single pass
+        artists: Counter = Counter()
+        albums: Counter = Counter()
+        years: Counter = Counter()
+        track_numbers = []
 
         for file_meta in files_metadata:
-            if "error" not in file_meta:
-                artist = file_meta.get("artist")
-                album = file_meta.get("album")
-                year = file_meta.get("date")
-
-                if artist:
-                    artists[artist] = artists.get(artist, 0) + 1
-                if album:
-                    albums[album] = albums.get(album, 0) + 1
-                if year:
-                    # Extract just the year
-                    year_str = str(year)[:4]
-                    if year_str.isdigit():
-                        years[year_str] = years.get(year_str, 0) + 1
+            if "error" in file_meta:
+                continue
+            artist = file_meta.get("artist")
+            album = file_meta.get("album")
+            year = file_meta.get("date")
+            track = file_meta.get("track")
+
+            if artist:
+                artists[artist] += 1
+            if album:
+                albums[album] += 1
+            if year:
+                # Extract just the year
+                year_str = str(year)[:4]
+                if year_str.isdigit():
+                    years[year_str] += 1
+            if track:
+                try:
+                    # Handle "1/12" format
+                    track_numbers.append(int(str(track).split("/")[0]))
+                except (ValueError, AttributeError):
+                    pass
 
         # Find most common values
+        total = len(files_metadata)
         if artists:
-            most_common_artist = max(artists.items(), key=lambda x: x[1])
-            if most_common_artist[1] > len(files_metadata) * 0.7:
-                analysis["common_artist"] = most_common_artist[0]
-            elif len(set(artists.keys())) > 5:
+            artist, count = artists.most_common(1)[0]
+            if count > total * 0.7:
+                analysis["common_artist"] = artist
+            elif len(artists) > 5:
                 analysis["likely_compilation"] = True
 
         if albums:
-            most_common_album = max(albums.items(), key=lambda x: x[1])
-            if most_common_album[1] > len(files_metadata) * 0.7:
-                analysis["common_album"] = most_common_album[0]
+            album, count = albums.most_common(1)[0]
+            if count > total * 0.7:
+                analysis["common_album"] = album
 
         if years:
-            most_common_year = max(years.items(), key=lambda x: x[1])
-            if most_common_year[1] > len(files_metadata) * 0.5:
-                analysis["common_year"] = most_common_year[0]
+            year, count = years.most_common(1)[0]
+            if count > total * 0.5:
+                analysis["common_year"] = year
 
         # Analyze track numbering
-        track_numbers = []
-        for file_meta in files_metadata:
-            if "track" in file_meta and file_meta["track"]:
-                try:
-                    # Handle "1/12" format
-                    track_str = str(file_meta["track"]).split("/")[0]
-                    track_num = int(track_str)
-                    track_numbers.append(track_num)
-                except (ValueError, AttributeError):
-                    pass
-
         if track_numbers:
             track_numbers.sort()
             if track_numbers == list(range(1, len(track_numbers) + 1)):
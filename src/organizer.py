@@ -1,7 +1,7 @@
 """Main music organization orchestrator."""
 
 from pathlib import Path
- 
+from typing import Optional
 
 from .inference import InferenceProvider
 from .analyzers import DirectoryAnalyzer, StructureClassifier
@@ -10,10 +10,10 @@ from .trackers import ProgressTracker, StateManager
 from .jobs import SQLiteJobStore
 import multiprocessing
 import os
-from .worker import run_scan_worker, run_analyze_worker, run_move_worker
+import time
+from .worker import run_scan_move_worker, run_analyze_worker
 import logging
 logger = logging.getLogger("wts.organizer")
-from pathlib import Path
 
 
 class MusicOrganizer:
@@ -47,18 +47,64 @@ class MusicOrganizer:
         self.state_manager = StateManager()
         self.jobstore = SQLiteJobStore()
 
-        # Dedicated single-purpose worker processes (disabled under test)
+        # Dedicated worker processes, started by start_workers once the app serves
         self.worker_processes: list[multiprocessing.Process] = []
-        is_test_env = bool(os.getenv("PYTEST_CURRENT_TEST")) or os.getenv("WTS_DISABLE_WORKERS") == "1"
-        if not is_test_env:
-            for target in (run_scan_worker, run_analyze_worker, run_move_worker):
-                p = multiprocessing.Process(target=target, daemon=True)
-                logger.info(f"Starting worker process {target}")
-                p.start()
-                self.worker_processes.append(p)
+        # Set by stop_workers; the workers wait on it between polls
+        self._worker_stop = multiprocessing.Event()
+        # The worker that copies albums; stop_workers gives it longer to finish
+        self._move_process: Optional[multiprocessing.Process] = None
 
         # No in-process processors needed for web UI + workers
 
+    def start_workers(self) -> None:
+        """Start the worker processes unless they are running (or disabled under test).
+
+        Constructing an organizer does not fork; the server calls this on
+        startup, and repeated calls are no-ops.
+        """
+        is_test_env = bool(os.getenv("PYTEST_CURRENT_TEST")) or os.getenv("WTS_DISABLE_WORKERS") == "1"
+        if is_test_env or self.worker_processes:
+            return
+        # A fresh event, in case an earlier set of workers was stopped
+        self._worker_stop = multiprocessing.Event()
+        # Scanning and moving share one filesystem-bound process; analysis waits on the LLM
+        for target in (run_scan_move_worker, run_analyze_worker):
+            p = multiprocessing.Process(target=target, kwargs={"stop": self._worker_stop}, daemon=True)
+            logger.info(f"Starting worker process {target}")
+            p.start()
+            self.worker_processes.append(p)
+            if target is run_scan_move_worker:
+                self._move_process = p
+
+    def stop_workers(self, timeout: float = 10.0, move_timeout: float = 120.0) -> None:
+        """Ask the worker processes to exit and wait for them.
+
+        Workers finish the job in hand. The scan/move worker gets move_timeout
+        seconds, so an album copy in progress can complete; the analyze worker
+        gets timeout seconds. Any worker still running after its limit is
+        terminated, so shutdown cannot hang on a stuck copy.
+        """
+        self._worker_stop.set()
+        started = time.monotonic()
+        for p in self.worker_processes:
+            is_mover = p is self._move_process
+            limit = move_timeout if is_mover else timeout
+            p.join(max(0.0, started + limit - time.monotonic()))
+            if p.is_alive():
+                if is_mover:
+                    logger.warning(
+                        f"Move worker {p.pid} still running after {limit:.0f}s; terminating it, "
+                        "the album being copied may be incomplete"
+                    )
+                else:
+                    logger.warning(f"Terminating worker process {p.pid}")
+                p.terminate()
+        self.worker_processes = []
+        self._move_process = None
+        # The workers closed their own connections and copy pools; release this process's too
+        self.jobstore.close()
+        self.file_organizer.close()
+
     def update_paths(self, source_dir: Path, target_dir: Path) -> None:
         """Update source/target directories and refresh dependent components without spawning a new worker.
 
@@ -67,10 +113,12 @@ class MusicOrganizer:
         """
         self.source_dir = source_dir
         self.target_dir = target_dir
-        # Refresh components that depend on target/source paths
-        self.file_organizer = FileOrganizer(self.target_dir)
+        # Refresh components that depend on target/source paths in place, so
+        # anything holding a reference (e.g. the server's handlers) sees the change
+        self.file_organizer.retarget(self.target_dir)
+        self.directory_analyzer.clear_caches()
         # Reset progress tracking for a new run
-        self.progress_tracker = ProgressTracker()
+        self.progress_tracker.reset()
 
 
  
@@ -1,24 +1,198 @@
 """File organization and movement operations."""
 
+import os
 import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 from ..metadata import MetadataExtractor
 
 logger = logging.getLogger("wts.file_organizer")
 
 
+def _copy_threads() -> int:
+    """Concurrent file copies per album: WTS_COPY_THREADS, else min(4, CPU count).
+
+    Set it to 1 for spinning disks, where parallel copies only add seeks.
+    """
+    try:
+        return max(1, int(os.environ["WTS_COPY_THREADS"]))
+    except (KeyError, ValueError):
+        return min(4, os.cpu_count() or 1)
+
+
+# Linux FICLONE ioctl: share the source's extents (btrfs, XFS, bcachefs)
+_FICLONE = 0x40049409
+
+COPY_MODES = ("copy", "reflink", "link")
+
+
+def _copy_mode() -> str:
+    """How files reach the target: WTS_COPY_MODE (copy, reflink or link), default copy."""
+    mode = (os.getenv("WTS_COPY_MODE") or "copy").lower()
+    return mode if mode in COPY_MODES else "copy"
+
+
+def _preserve_stat() -> bool:
+    """Whether copies keep the source's timestamps and mode: WTS_PRESERVE_STAT, default on."""
+    return (os.getenv("WTS_PRESERVE_STAT") or "1").lower() not in ("0", "false", "no", "off")
+
+
+def _remove_target(dst: Union[str, Path]) -> None:
+    """Unlink an existing dst before it is rewritten.
+
+    Opening it for writing instead would truncate whatever it is linked to;
+    a target hardlinked by an earlier link-mode run is the source file itself.
+    """
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+
+
+def _reflink_file(
+    src: Union[str, Path], dst: Union[str, Path], preserve_stat: bool = True, dst_exists: bool = True
+) -> bool:
+    """Clone src into dst without copying data; False if the filesystem cannot.
+
+    Pass dst_exists=False only when dst is known to be absent, to skip removing it.
+    """
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - not available on Windows
+        return False
+    try:
+        if dst_exists:
+            _remove_target(dst)
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            if preserve_stat:
+                _copy_stat_fd(os.fstat(fsrc.fileno()), fdst.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def _copy_stat_fd(src_stat: os.stat_result, fd: int) -> None:
+    """Give the open file fd src's timestamps and permission bits.
+
+    Works on the descriptor already open for the copy, so the target path
+    is not resolved again; unlike shutil.copystat, extended attributes are
+    not copied.
+    """
+    os.utime(fd, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    os.chmod(fd, stat.S_IMODE(src_stat.st_mode))
+
+
+def _link_file(src: Union[str, Path], dst: Union[str, Path], dst_exists: bool = True) -> bool:
+    """Hardlink src at dst, replacing an existing dst; False across filesystems."""
+    try:
+        if dst_exists:
+            _remove_target(dst)
+        os.link(src, dst)
+    except OSError:
+        return False
+    return True
+
+
+def _up_to_date(src: Union[str, Path], dst: Union[str, Path]) -> bool:
+    """True if dst already holds src: same size and same mtime, as an earlier copy
+    that preserved src's timestamps left it. A different file that is merely
+    newer does not match."""
+    try:
+        dst_stat = os.stat(dst)
+    except OSError:
+        return False
+    src_stat = os.stat(src)
+    return dst_stat.st_size == src_stat.st_size and dst_stat.st_mtime_ns == src_stat.st_mtime_ns
+
+
+def _copy_file(
+    src: Union[str, Path], dst: Union[str, Path], preserve_stat: bool = True, dst_exists: bool = True
+) -> None:
+    """Copy src to dst, letting the kernel move the bytes when it can.
+
+    copy_file_range copies inside the kernel and becomes a reflink on
+    filesystems that support it (btrfs, XFS); otherwise shutil.copyfile is
+    used, which itself uses sendfile on Linux. With preserve_stat the
+    timestamps and permission bits are copied too, set through the open
+    descriptor on the copy_file_range path. An existing dst is removed
+    first, never overwritten in place; pass dst_exists=False only when dst
+    is known to be absent.
+    """
+    if dst_exists:
+        _remove_target(dst)
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                src_stat = os.fstat(fsrc.fileno())
+                remaining = src_stat.st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0 and preserve_stat:
+                    _copy_stat_fd(src_stat, fdst.fileno())
+            if remaining == 0:
+                return
+        except OSError:
+            # e.g. EXDEV on older kernels or an unsupported filesystem
+            pass
+    if preserve_stat:
+        shutil.copy2(src, dst)
+    else:
+        shutil.copyfile(src, dst)
+
+
 class FileOrganizer:
     """Handles actual file movement and copying operations."""
 
-    def __init__(self, target_dir: Path):
+    # Characters that are invalid in file names on common filesystems
+    _SANITIZE_TABLE = str.maketrans({c: "_" for c in '<>:"/\\|?*'})
+
+    def __init__(self, target_dir: Path, copy_mode: Optional[str] = None, preserve_stat: Optional[bool] = None):
         """Initialize the file organizer.
 
         Args:
             target_dir: Target directory for organized music
+            copy_mode: "copy" (default), "reflink" or "link"; falls back to
+                WTS_COPY_MODE. Reflinks and hardlinks cost no data movement
+                but fall back to a full copy when the filesystem refuses them.
+                Hardlinked files share contents with the source, so tag edits
+                in the library also change the original.
+            preserve_stat: Copy timestamps and permission bits to each new
+                file (default); without it a copy skips those extra syscalls
+                and gets the current time (tags travel inside the file either
+                way). Falls back to WTS_PRESERVE_STAT.
         """
+        if copy_mode is not None and copy_mode not in COPY_MODES:
+            raise ValueError(f"Unsupported copy mode: {copy_mode}")
         self.target_dir = target_dir
+        self.copy_mode = copy_mode or _copy_mode()
+        self.preserve_stat = _preserve_stat() if preserve_stat is None else preserve_stat
+        # Created on first use and reused for every album, so the mover does
+        # not start and join a fresh set of threads per folder
+        self._copy_pool: Optional[ThreadPoolExecutor] = None
+
+    def retarget(self, target_dir: Path) -> None:
+        """Organize into target_dir from now on, keeping the copy pool and settings.
+
+        Args:
+            target_dir: New target directory for organized music
+        """
+        self.target_dir = target_dir
+
+    def close(self) -> None:
+        """Shut down the copy thread pool once no album is being organized.
+
+        A later organize_folder starts a fresh pool.
+        """
+        if self._copy_pool is not None:
+            self._copy_pool.shutdown()
+            self._copy_pool = None
 
     def organize_folder(self, source_folder: Path, proposal: Dict) -> int:
         """Organize a folder based on the accepted proposal.
@@ -39,27 +213,67 @@ class FileOrganizer:
         album_dir = self.target_dir / artist / f"{album} ({year})"
         album_dir.mkdir(parents=True, exist_ok=True)
 
-        # Copy all music files
-        copied = 0
-        for ext in MetadataExtractor.SUPPORTED_FORMATS:
-            # Find all files with this extension
-            for file_path in source_folder.rglob(f"*{ext}"):
-                try:
-                    # Maintain relative structure within the album folder
-                    relative_path = file_path.relative_to(source_folder)
-                    target_path = album_dir / relative_path
-                    target_path.parent.mkdir(parents=True, exist_ok=True)
-
-                    shutil.copy2(file_path, target_path)
-                    copied += 1
-                except Exception as e:
-                    logger.error(f"Error copying {file_path.name}: {e}")
+        # Collect all music files in a single walk of the source tree
+        # Paths stay plain strings here: this loop runs once per file
+        # (source, target, whether target's name was already in its directory)
+        pairs: List[Tuple[str, str, bool]] = []
+        is_music = MetadataExtractor.is_music_name
+        join = os.path.join
+        for root, _, files in os.walk(source_folder):
+            music_names = [name for name in files if is_music(name)]
+            if not music_names:
+                continue
+            # Maintain relative structure within the album folder; the target
+            # directory is resolved and created once per directory, not per file
+            target_root = os.path.normpath(join(album_dir, os.path.relpath(root, source_folder)))
+            try:
+                os.makedirs(target_root, exist_ok=True)
+                # One listing per directory tells which targets can exist at all,
+                # so first-time copies skip a failing stat per file
+                existing = set(os.listdir(target_root))
+            except OSError as e:
+                logger.error(f"Error creating {target_root}: {e}")
+                continue
+            pairs.extend(
+                (join(root, name), join(target_root, name), name in existing) for name in music_names
+            )
+
+        # Copies are I/O bound, so overlap them to keep fast disks busy
+        if len(pairs) > 1 and _copy_threads() > 1:
+            copied = sum(self._get_copy_pool().map(self._copy_one, pairs))
+        else:
+            copied = sum(self._copy_one(pair) for pair in pairs)
         logger.info(
             f"Organized {copied} files to: {album_dir.relative_to(self.target_dir)}"
         )
 
         return copied
 
+    def _get_copy_pool(self) -> ThreadPoolExecutor:
+        if self._copy_pool is None:
+            self._copy_pool = ThreadPoolExecutor(
+                max_workers=_copy_threads(), thread_name_prefix="wts-copy"
+            )
+        return self._copy_pool
+
+    def _copy_one(self, pair: Tuple[str, str, bool]) -> bool:
+        """Copy one (source, target, target_exists) entry, logging instead of raising on failure."""
+        source, target, target_exists = pair
+        try:
+            # Only copies that kept the source mtime can be recognized; without
+            # preserve_stat every existing target is overwritten
+            if self.preserve_stat and target_exists and _up_to_date(source, target):
+                return True
+            if self.copy_mode == "link" and _link_file(source, target, target_exists):
+                return True
+            if self.copy_mode == "reflink" and _reflink_file(source, target, self.preserve_stat, target_exists):
+                return True
+            _copy_file(source, target, self.preserve_stat, target_exists)
+            return True
+        except Exception as e:
+            logger.error(f"Error copying {os.path.basename(source)}: {e}")
+            return False
+
     def _sanitize_filename(self, name: str) -> str:
         """Sanitize a string for use as a filename.
 
@@ -69,10 +283,5 @@ class FileOrganizer:
         Returns:
             Sanitized filename
         """
-        # Remove or replace invalid characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            name = name.replace(char, "_")
-
-        # Limit length
-        return name[:120].strip()
+        # Replace invalid characters in one pass, then limit length
+        return name.translate(self._SANITIZE_TABLE)[:120].strip()
@@ -1,7 +1,7 @@
 """Processor for artist collection structures."""
 
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
  
 
 from ..analyzers import DirectoryAnalyzer
@@ -51,11 +51,21 @@ class CollectionProcessor:
 
         # Process each album subdirectory
         successful_albums = []
-
-        for subdir_info in structure_analysis["subdirectories"]:
-            if subdir_info["music_files"] == 0:
-                continue
-
+        album_infos = [s for s in structure_analysis["subdirectories"] if s["music_files"] > 0]
+        # One query for every album's finished proposal instead of one per album
+        ready = self.jobstore.fetch_ready_for(Path(s["path"]) for s in album_infos)
+        # Queue every album without a job in one transaction, replacing a lookup per
+        # album, so the analyze worker works ahead while earlier albums are handled
+        self.jobstore.enqueue_many(
+            (
+                (Path(s["path"]), {"folder_name": s["name"]}, artist_name, "analyze")
+                for s in album_infos
+                if s["path"] not in ready
+            ),
+            skip_tracked=True,
+        )
+
+        for subdir_info in album_infos:
             album_folder = Path(subdir_info["path"])
             console.print(f"\n[cyan]Processing album: {album_folder.name}[/cyan]")
 
@@ -67,7 +77,7 @@ class CollectionProcessor:
 
             # Process this individual album
             album_result = self._process_individual_album(
-                album_folder, metadata, artist_name
+                album_folder, metadata, artist_name, ready.get(str(album_folder))
             )
 
             if album_result:
@@ -81,7 +91,7 @@ class CollectionProcessor:
         return False
 
     def _process_individual_album(
-        self, album_folder: Path, metadata: Dict, artist_hint: str
+        self, album_folder: Path, metadata: Dict, artist_hint: str, existing: Optional[Dict] = None
     ) -> Dict:
         """Process an individual album within a collection.
 
@@ -89,6 +99,7 @@ class CollectionProcessor:
             album_folder: Album folder to process
             metadata: Extracted metadata
             artist_hint: Artist name hint from collection folder
+            existing: Ready proposal already fetched for this album, if any
 
         Returns:
             Proposal dict if successful, None if skipped/cancelled
@@ -96,7 +107,7 @@ class CollectionProcessor:
         # No terminal UI; React handles presentation
 
         # Get LLM proposal with artist hint (prefer external worker, then background)
-        proposal = self._get_proposal(album_folder, metadata, artist_hint=artist_hint)
+        proposal = existing or self._get_proposal(album_folder, metadata, artist_hint=artist_hint, queued=True)
 
         # Interactive loop for user feedback
         while True:
@@ -128,10 +139,12 @@ class CollectionProcessor:
         metadata: Dict,
         user_feedback: str = None,
         artist_hint: str = None,
+        queued: bool = False,
     ) -> Dict:
         """Fetch proposal produced by the background analyze worker via SQLiteJobStore.
 
-        If no result exists yet, enqueue an analyze job and wait for it.
+        If no result exists yet, enqueue an analyze job and wait for it. With
+        queued, the caller already enqueued the folder and the check is skipped.
         """
         # Use existing result when present (and not explicitly asking for reconsideration)
         if not user_feedback:
@@ -141,7 +154,7 @@ class CollectionProcessor:
                 return ext
 
         # Enqueue analyze job if none exists for this folder
-        if not self.jobstore.has_any_for_folder(folder):
+        if not queued and not self.jobstore.has_any_for_folder(folder):
             self.jobstore.enqueue(
                 folder,
                 metadata,
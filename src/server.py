@@ -4,6 +4,7 @@ import asyncio
 import json
 from pathlib import Path
 import os
+import stat
 from typing import Any, Dict, Optional
 from contextlib import asynccontextmanager
 
@@ -13,7 +14,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from .organizer import MusicOrganizer
-import httpx
 
 
 def create_app(organizer: MusicOrganizer) -> FastAPI:
@@ -22,6 +22,8 @@ def create_app(organizer: MusicOrganizer) -> FastAPI:
 
     @asynccontextmanager
     async def app_lifespan(app: FastAPI):
+        # Workers are started by the serving app, not when the organizer is built
+        organizer.start_workers()
         # Startup: enqueue initial scan job if DB empty
         try:
             counts = organizer.jobstore.counts()
@@ -38,6 +40,9 @@ def create_app(organizer: MusicOrganizer) -> FastAPI:
             yield
         finally:
             shutdown_event.set()
+            # Let the workers finish their current job instead of dying with the server;
+            # this also closes the job store connections the request threads opened
+            await asyncio.to_thread(organizer.stop_workers)
 
     app = FastAPI(title="What's That Sound API", lifespan=app_lifespan)
     # CORS for local Vite dev server
@@ -51,6 +56,20 @@ def create_app(organizer: MusicOrganizer) -> FastAPI:
     # Staged (unapplied) path changes
     staged_source: Optional[Path] = None
     staged_target: Optional[Path] = None
+    # Source entry count, keyed on (path, directory mtime) so status polls skip the listing
+    source_count_key: Optional[tuple] = None
+    source_count = 0
+
+    def count_source_entries() -> int:
+        nonlocal source_count_key, source_count
+        source_dir = organizer.source_dir
+        # Adding, removing or renaming an entry bumps the directory's mtime
+        key = (str(source_dir), source_dir.stat().st_mtime_ns)
+        if key != source_count_key:
+            with os.scandir(source_dir) as it:
+                source_count = sum(1 for _ in it)
+            source_count_key = key
+        return source_count
 
 
 
@@ -59,16 +78,15 @@ def create_app(organizer: MusicOrganizer) -> FastAPI:
 
     @app.get("/api/status")
     def status():
-        counts = organizer.jobstore.counts()
-        ready = organizer.jobstore.fetch_ready(limit=200)
+        snapshot = organizer.jobstore.snapshot(ready_limit=200)
         stats = organizer.progress_tracker.get_stats()
         return {
             "source_dir": str(organizer.source_dir),
             "target_dir": str(organizer.target_dir),
-            "counts": counts,
+            "counts": snapshot.counts,
             "processed": stats.get("total_processed", 0),
-            "total": len(list(organizer.source_dir.iterdir())),
-            "ready": [{"path": fp, "name": Path(fp).name} for _, fp, _ in ready],
+            "total": count_source_entries(),
+            "ready": [{"path": fp, "name": os.path.basename(fp)} for _, fp, _ in snapshot.ready],
         }
 
     @app.get("/api/paths")
@@ -114,14 +132,18 @@ def create_app(organizer: MusicOrganizer) -> FastAPI:
     @app.get("/api/list")
     def list_dirs(path: str):
         base = Path(path)
-        if not base.exists():
+        # One stat answers both checks
+        try:
+            base_stat = os.stat(base)
+        except OSError:
             raise HTTPException(404, "path not found")
-        if not base.is_dir():
+        if not stat.S_ISDIR(base_stat.st_mode):
             raise HTTPException(400, "not a directory")
         try:
-            entries = []
-            for p in sorted([d for d in base.iterdir() if d.is_dir()]):
-                entries.append({"name": p.name, "path": str(p)})
+            # One scandir listing; DirEntry.is_dir() uses the d_type it returned instead of a stat per entry
+            with os.scandir(base) as it:
+                dirs = sorted((e.name, e.path) for e in it if e.is_dir())
+            entries = [{"name": name, "path": path} for name, path in dirs]
             parent = str(base.parent) if base.parent != base else ""
             return {"entries": entries, "parent": parent}
         except Exception as e:
@@ -130,7 +152,7 @@ def create_app(organizer: MusicOrganizer) -> FastAPI:
     @app.get("/api/ready")
     def ready(limit: int = 50):
         items = organizer.jobstore.fetch_ready(limit=limit)
-        return [{"path": fp, "name": Path(fp).name} for _, fp, _ in items]
+        return [{"path": fp, "name": os.path.basename(fp)} for _, fp, _ in items]
 
     @app.get("/api/folder")
     def folder(path: str):
@@ -161,7 +183,9 @@ def create_app(organizer: MusicOrganizer) -> FastAPI:
             user_classification = payload.get("user_classification")  # optional override: single_album|multi_disc_album|artist_collection
             # If the user is on a disc subfolder and indicates multi-disc, requeue the parent instead
             parent = folder.parent if user_classification == "multi_disc_album" else folder
-            metadata = organizer.directory_analyzer.extract_folder_metadata(parent)
+            # The analyze worker re-reads the folder itself; only the override is
+            # needed from here, so the request does no folder I/O of its own
+            metadata: Dict[str, Any] = {"folder_name": parent.name}
             if user_classification:
                 metadata["user_classification"] = user_classification
             # Reset existing job back to queued to re-run with latest logic/feedback
@@ -175,26 +199,72 @@ def create_app(organizer: MusicOrganizer) -> FastAPI:
         else:
             raise HTTPException(400, "invalid action")
 
-    # Shared SSE generator for status/events
-    async def status_event_stream(request: Request):
-        while not shutdown_event.is_set():
-            counts = organizer.jobstore.counts()
+    # One status poller shared by every /api/events client: it runs as a single
+    # task on the event loop while anyone is subscribed, and each client only
+    # waits for the next message instead of polling the job store itself
+    status_message = ""
+    status_seq = 0
+    status_changed = asyncio.Condition()
+    status_task: Optional[asyncio.Task] = None
+    subscribers = 0
+
+    async def publish_status():
+        nonlocal status_message, status_seq
+        last_data = None
+        last_version = None
+        snapshot = None
+        while subscribers and not shutdown_event.is_set():
+            # Re-read jobs only after some other connection committed; the workers
+            # and API handlers all write through their own connections
+            version = organizer.jobstore.data_version()
+            if version != last_version:
+                # Include a small rolling window of recent jobs for live debug panel
+                snapshot = organizer.jobstore.snapshot(recent_limit=25)
+                last_version = version
             stats = organizer.progress_tracker.get_stats()
-            # Include a small rolling window of recent jobs for live debug panel
-            debug_recent = organizer.jobstore.recent_jobs(limit=25)
             data = {
-                "counts": counts,
+                "counts": snapshot.counts,
                 "processed": stats.get("total_processed", 0),
-                "total": len(list(organizer.source_dir.iterdir())),
-                "debug": {"recent": debug_recent},
+                "total": count_source_entries(),
+                "debug": {"recent": snapshot.recent},
             }
-            yield f"data: {json.dumps(data)}\n\n"
+            if data != last_data:
+                # Encoded once, however many clients are listening
+                status_message = f"data: {json.dumps(data)}\n\n"
+                status_seq += 1
+                last_data = data
+                async with status_changed:
+                    status_changed.notify_all()
             # Wake up promptly when shutting down instead of waiting the full interval
             try:
                 await asyncio.wait_for(shutdown_event.wait(), timeout=1.0)
             except asyncio.TimeoutError:
                 pass
 
+    async def status_event_stream(request: Request):
+        nonlocal status_task, subscribers
+        subscribers += 1
+        if status_task is None or status_task.done():
+            status_task = asyncio.create_task(publish_status())
+        seen = 0
+        try:
+            while not shutdown_event.is_set():
+                async with status_changed:
+                    if status_seq == seen:
+                        try:
+                            await asyncio.wait_for(status_changed.wait(), timeout=1.0)
+                        except asyncio.TimeoutError:
+                            pass
+                if status_seq != seen:
+                    seen = status_seq
+                    yield status_message
+                else:
+                    # Nothing changed: a comment line keeps the connection alive without
+                    # re-encoding the payload or making the client parse and re-render it
+                    yield ": keepalive\n\n"
+        finally:
+            subscribers -= 1
+
     @app.get("/api/events")
     async def events(request: Request):
         return StreamingResponse(status_event_stream(request), media_type="text/event-stream")
@@ -203,14 +273,15 @@ def create_app(organizer: MusicOrganizer) -> FastAPI:
     def debug_jobs(limit: int = 100, statuses: Optional[str] = None):
         # statuses may be a comma-separated list
         status_list = [s.strip() for s in statuses.split(",")] if statuses else None
-        return {
-            "counts": organizer.jobstore.counts(),
-            "recent": organizer.jobstore.recent_jobs(limit=limit, statuses=status_list),
-        }
+        snapshot = organizer.jobstore.snapshot(recent_limit=limit, recent_statuses=status_list)
+        return {"counts": snapshot.counts, "recent": snapshot.recent}
 
     # Development mode: redirect root to Vite dev server for HMR
     
     if os.getenv("WTS_DEV") == "1":
+        # Only the dev proxy needs an HTTP client; keep it out of production startup
+        import httpx
+
         # Simple reverse proxy to Vite dev server for HMR in dev.
         VITE_DEV_BASE = os.getenv("WTS_VITE_URL", "http://127.0.0.1:5173")
         project_root = Path(__file__).resolve().parent.parent
@@ -1,12 +1,38 @@
 """State management for music organization."""
 import logging
 import json
+import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List
+
+try:  # Optional C encoder; the stdlib json module is used without it
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
 
 
 logger = logging.getLogger("wts.state_manager")
 
+# Written into a source folder once its proposal is accepted
+TRACKER_FILENAME = ".whats-that-sound"
+# Bumped when the tracker layout changes; organized_timestamp is epoch nanoseconds
+TRACKER_VERSION = 1
+
+
+def _write_tracker(tracker_file: Path, tracker_data: Dict[str, Any]) -> None:
+    """Write tracker JSON (2-space indent, UTF-8), via orjson when installed."""
+    if orjson is not None:
+        try:
+            data = orjson.dumps(tracker_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+        else:
+            tracker_file.write_bytes(data)
+            return
+    with open(tracker_file, "w", encoding="utf-8") as f:
+        json.dump(tracker_data, f, indent=2, ensure_ascii=False)
+
+
 class StateManager:
     """Manages organization state and tracker files."""
 
@@ -24,7 +50,7 @@ class StateManager:
         Returns:
             True if folder is already organized
         """
-        tracker_file = folder / ".whats-that-sound"
+        tracker_file = folder / TRACKER_FILENAME
         return tracker_file.exists()
 
     def filter_unorganized_folders(self, folders: List[Path]) -> tuple[List[Path], int]:
@@ -42,10 +68,12 @@ class StateManager:
         for folder in folders:
             if self.is_already_organized(folder):
                 organized_count += 1
-                logger.info(f"Skipping {folder.name} (already organized)")
+                logger.debug("Skipping %s (already organized)", folder.name)
             else:
                 unorganized_folders.append(folder)
 
+        if organized_count:
+            logger.info(f"Skipping {organized_count} already organized folders")
         return unorganized_folders, organized_count
 
     def save_proposal_tracker(self, source_folder: Path, proposal: Dict):
@@ -55,17 +83,17 @@ class StateManager:
             source_folder: Source folder that was organized
             proposal: The accepted proposal
         """
-        tracker_file = source_folder / ".whats-that-sound"
+        tracker_file = source_folder / TRACKER_FILENAME
 
         tracker_data = {
             "proposal": proposal,
             "folder_name": source_folder.name,
-            "organized_timestamp": str(Path().absolute()),
+            "organized_timestamp": time.time_ns(),
+            "organized_version": TRACKER_VERSION,
         }
 
         try:
-            with open(tracker_file, "w", encoding="utf-8") as f:
-                json.dump(tracker_data, f, indent=2, ensure_ascii=False)
+            _write_tracker(tracker_file, tracker_data)
             logger.info(
                 f"[dim]Saved organization record to {tracker_file.name}[/dim]"
             )
@@ -79,18 +107,18 @@ class StateManager:
             folder: Artist collection folder
             albums: List of successfully organized albums
         """
-        tracker_file = folder / ".whats-that-sound"
+        tracker_file = folder / TRACKER_FILENAME
 
         tracker_data = {
             "collection_type": "artist_collection",
             "folder_name": folder.name,
             "albums": albums,
-            "organized_timestamp": str(Path().absolute()),
+            "organized_timestamp": time.time_ns(),
+            "organized_version": TRACKER_VERSION,
         }
 
         try:
-            with open(tracker_file, "w", encoding="utf-8") as f:
-                json.dump(tracker_data, f, indent=2, ensure_ascii=False)
+            _write_tracker(tracker_file, tracker_data)
             logger.info(f"Saved collection record to {tracker_file.name}")
         except Exception as e:
             logger.error(f"Warning: Could not save tracker file: {e}")
@@ -104,14 +132,19 @@ class StateManager:
         Returns:
             Dictionary containing tracker data or empty dict if not found
         """
-        tracker_file = folder / ".whats-that-sound"
+        tracker_file = folder / TRACKER_FILENAME
 
-        if not tracker_file.exists():
+        # Open directly rather than checking exists() first: one syscall, no race
+        try:
+            data = tracker_file.read_bytes()
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            logger.error(f"Error loading tracker file: {e}")
             return {}
 
         try:
-            with open(tracker_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return orjson.loads(data) if orjson is not None else json.loads(data.decode("utf-8"))
         except Exception as e:
             logger.error(f"Error loading tracker file: {e}")
             return {}
@@ -3,15 +3,23 @@
 We avoid Celery to keep deployment simple (no external broker). This worker
 can be spawned as a separate process and will process jobs concurrently using
 threads within the process for I/O-bound inference.
+
+Each run_*_worker loop accepts an optional stop event (threading.Event or
+multiprocessing.Event). Idle waits block on it, so setting it ends the
+worker promptly, after the job in hand.
 """
 
 from __future__ import annotations
 
 import argparse
+import json
 import os
 import sys
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Set
 
 from .jobs import SQLiteJobStore
 from .generators.proposal_generator import ProposalGenerator
@@ -20,49 +28,97 @@ from .analyzers import DirectoryAnalyzer, StructureClassifier
 import logging
 
 
-def _process_one(jobstore: SQLiteJobStore, generator: ProposalGenerator, job_id: int, folder_path: str, metadata_json: str, user_feedback: Optional[str], artist_hint: Optional[str], job_type: str):
-    import json
-    from pathlib import Path
+def _list_subdirs(base: Path) -> List[Path]:
+    """Sorted child directories of base from one scandir pass (no per-entry stat)."""
+    with os.scandir(base) as it:
+        return sorted(Path(e.path) for e in it if e.is_dir())
+
 
+def _pin_worker(kind: str) -> Optional[int]:
+    """Pin this worker process to one core when WTS_CPU_AFFINITY=1 (off by default).
+
+    CPU-bound workers ("cpu") take the lowest allowed core and filesystem
+    workers ("io") the highest, so the two never share a core when more
+    than one is available. Returns the chosen core, or None if not pinned.
+    """
+    if os.getenv("WTS_CPU_AFFINITY") != "1" or not hasattr(os, "sched_setaffinity"):
+        return None
+    cores = sorted(os.sched_getaffinity(0))
+    core = cores[0] if kind == "cpu" else cores[-1]
     try:
-        metadata = json.loads(metadata_json)
-        if job_type == "scan":
-            # Scan a directory and enqueue analyze jobs for discovered album folders
-            from pathlib import Path as _P
-            base = _P(folder_path)
-            for d in sorted([p for p in base.iterdir() if p.is_dir()]):
-                if jobstore.has_any_for_folder(d):
-                    continue
-                # Minimal metadata; downstream analyzer will compute full metadata
-                jobstore.enqueue(d, {"folder_name": d.name}, job_type="analyze")
-            # Mark scan job as completed
-            jobstore.update_latest_status_for_folder(base, ["analyzing"], "completed")
-        else:
-            result = generator.get_llm_proposal(folder_path=folder_path, metadata=metadata, user_feedback=user_feedback, artist_hint=artist_hint)
-            # Mark job as ready (formerly 'approved')
-            jobstore.approve(job_id, result)
-    except Exception as e:
-        jobstore.fail(job_id, e)
-        raise e
+        os.sched_setaffinity(0, {core})
+    except OSError as e:
+        logging.getLogger("wts.worker").warning(f"Could not pin {kind} worker to core {core}: {e}")
+        return None
+    return core
+
 
+def _wait_for_change(jobstore: SQLiteJobStore, stop, timeout: float) -> None:
+    """Idle until another connection commits, stop is set, or timeout seconds pass.
 
-def run_scan_worker(poll_seconds: int = 300):
+    PRAGMA data_version is a cheap change token, so an idle worker wakes for
+    new work within a fraction of a second instead of sleeping out its poll
+    interval; checks back off from 50 ms to 1 s while nothing changes.
+    """
+    deadline = time.monotonic() + timeout
+    version = jobstore.data_version()
+    delay = 0.05
+    while not stop.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or stop.wait(min(delay, remaining)):
+            return
+        if jobstore.data_version() != version:
+            return
+        delay = min(delay * 2, 1.0)
+
+
+def _scan_pass(jobstore: SQLiteJobStore, known: Optional[Set[str]] = None) -> None:
+    """Enqueue analyze jobs for untracked children of WTS_SOURCE_DIR, if set.
+
+    known holds folders a previous pass in this session already saw tracked
+    (job rows are never removed), so later passes only touch new folders.
+    """
+    root = os.getenv("WTS_SOURCE_DIR")
+    if not root:
+        return
+    subdirs = _list_subdirs(Path(root))
+    if known is not None:
+        subdirs = [d for d in subdirs if str(d) not in known]
+        if not subdirs:
+            return
+    # The tracked-folder lookup and the inserts share one transaction per pass
+    jobstore.enqueue_many(
+        ((d, {"folder_name": d.name}, None, "analyze") for d in subdirs), skip_tracked=True
+    )
+    if known is not None:
+        # Each folder was either tracked already or has just been queued
+        known.update(str(d) for d in subdirs)
+
+
+def run_scan_worker(poll_seconds: int = 300, stop=None):
+    _pin_worker("io")
+    stop = stop or threading.Event()
     jobstore = SQLiteJobStore()
-    while True:
-        from pathlib import Path as _P
+    known: Set[str] = set()
+    while not stop.is_set():
         # Enqueue analyze jobs for subdirectories if missing
-        # Determine root from env (used by server startup), fallback to CWD
-        root = os.getenv("WTS_SOURCE_DIR")
-        if root:
-            base = _P(root)
-            for d in sorted([p for p in base.iterdir() if p.is_dir()]):
-                if jobstore.has_any_for_folder(d):
-                    continue
-                jobstore.enqueue(d, {"folder_name": d.name}, job_type="analyze")
-        time.sleep(poll_seconds)
-
-
-def run_analyze_worker(poll_seconds: int = 10):
+        # Determine root from env (used by server startup)
+        _scan_pass(jobstore, known)
+        stop.wait(poll_seconds)
+    jobstore.close()
+
+
+def _analyze_batch_size() -> int:
+    """Folders claimed and classified per LLM call: WTS_ANALYZE_BATCH, default 4."""
+    try:
+        return max(1, int(os.environ["WTS_ANALYZE_BATCH"]))
+    except (KeyError, ValueError):
+        return 4
+
+
+def run_analyze_worker(poll_seconds: int = 10, stop=None):
+    _pin_worker("cpu")
+    stop = stop or threading.Event()
     jobstore = SQLiteJobStore()
     # File logging for worker
     log_dir = os.getenv("WTS_LOG_DIR")
@@ -73,76 +129,257 @@ def run_analyze_worker(poll_seconds: int = 10):
     generator = ProposalGenerator(provider)
     analyzer = DirectoryAnalyzer()
     classifier = StructureClassifier(provider)
-    while True:
-        claimed = jobstore.claim_queued_for_analysis()
-        if not claimed:
-            time.sleep(poll_seconds)
+    # Reads folders' tags in the background while the classifier waits on the LLM
+    prefetch = ThreadPoolExecutor(max_workers=1)
+    batch_size = _analyze_batch_size()
+    # Lists a claimed batch's folders concurrently; the walks are I/O bound
+    analysis_pool = ThreadPoolExecutor(max_workers=batch_size)
+    while not stop.is_set():
+        claimed_jobs = jobstore.claim_queued_for_analysis_batch(batch_size)
+        if not claimed_jobs:
+            _wait_for_change(jobstore, stop, poll_seconds)
             continue
+        if not _analyze_batch(jobstore, analyzer, generator, classifier, claimed_jobs, analysis_pool, prefetch):
+            # The batch went back to the queue; give the cause (e.g. the LLM) time to recover
+            stop.wait(poll_seconds)
+    prefetch.shutdown(cancel_futures=True)
+    analysis_pool.shutdown(cancel_futures=True)
+    jobstore.close()
+
+
+def _analyze_batch(jobstore, analyzer, generator, classifier, claimed_jobs, analysis_pool, prefetch) -> bool:
+    """Classify and finish a claimed batch; errors are charged to the job that raised them.
+
+    A folder whose walk, metadata or proposal fails is marked error on its own.
+    If classifying the batch fails, every job still in analyzing is requeued
+    and False is returned; the worker keeps running either way.
+    """
+    logger = logging.getLogger("wts.worker")
+    # Always re-analyze and classify for safety
+    # The classifier works from the counts; the rendered tree is not needed
+    structure_futures = [
+        analysis_pool.submit(analyzer.analyze_directory_structure, Path(claimed.folder_path), render_tree=False)
+        for claimed in claimed_jobs
+    ]
+    prepared = []
+    for claimed, structure_future in zip(claimed_jobs, structure_futures):
+        folder_path = Path(claimed.folder_path)
         try:
-            import json
-            # Always re-analyze and classify for safety
-            from pathlib import Path as _P
-            folder_path = _P(claimed.folder_path)
-            structure = analyzer.analyze_directory_structure(folder_path)
+            structure = structure_future.result()
             # Allow user override of classification via metadata
             job_meta = json.loads(claimed.metadata_json) if claimed.metadata_json else {}
-            override = (job_meta or {}).get("user_classification")
-            if override in ("single_album", "multi_disc_album", "artist_collection"):
+        except Exception as e:
+            logger.exception(f"Could not analyze {folder_path}")
+            jobstore.fail(claimed.job_id, e)
+            continue
+        override = (job_meta or {}).get("user_classification")
+        if override not in _ANALYSIS_HANDLERS:
+            override = None
+        # Reconsidered folders are classified afresh rather than from the cache
+        reconsider = bool((job_meta or {}).get("reconsider"))
+        prepared.append((claimed, folder_path, structure, override, reconsider))
+
+    # Most folders are albums, so start reading their metadata now
+    # instead of after classification returns
+    metadata_futures = {
+        claimed.job_id: prefetch.submit(analyzer.extract_folder_metadata, folder_path, structure)
+        for claimed, folder_path, structure, override, _ in prepared
+        if override is None
+    }
+    # Folders without an override share one classification prompt
+    to_classify = [
+        structure for _, _, structure, override, reconsider in prepared if override is None and not reconsider
+    ]
+    try:
+        labels = iter(classifier.classify_batch(to_classify) if to_classify else [])
+    except Exception:
+        logger.exception("Batch classification failed; requeueing the batch")
+        for future in metadata_futures.values():
+            future.cancel()
+        # Hand the batch back rather than leaving it stuck in analyzing
+        for claimed, folder_path, *_ in prepared:
+            jobstore.update_latest_status_for_folder(folder_path, ["analyzing"], "queued")
+        return False
+
+    for claimed, folder_path, structure, override, reconsider in prepared:
+        # Taken before anything can raise, so the batch's label order is kept
+        label = None if override or reconsider else next(labels)
+        metadata_future = metadata_futures.get(claimed.job_id)
+        try:
+            if override:
                 classification = override
+            elif reconsider:
+                classification = classifier.classify_directory_structure(structure, refresh=True)
             else:
-                classification = classifier.classify_directory_structure(structure)
-            if classification == "artist_collection":
-                # Fan out: enqueue each album subdir with artist hint, then skip this job
-                for sub in structure.get("subdirectories", []):
-                    album_dir = folder_path / sub.get("name", "")
-                    if not album_dir.is_dir():
-                        continue
-                    if jobstore.has_any_for_folder(album_dir):
-                        continue
-                    album_meta = analyzer.extract_folder_metadata(album_dir)
-                    if album_meta.get("total_files", 0) > 0:
-                        jobstore.enqueue(album_dir, album_meta, artist_hint=folder_path.name, job_type="analyze")
-                jobstore.update_latest_status_for_folder(folder_path, ["analyzing"], "skipped")
-                continue
-            elif classification in ("single_album", "multi_disc_album"):
-                # Proceed to proposal generation
-                metadata = analyzer.extract_folder_metadata(folder_path)
-                if metadata.get("total_files", 0) == 0:
-                    jobstore.update_latest_status_for_folder(folder_path, ["analyzing"], "skipped")
-                    continue
-                result = generator.get_llm_proposal(metadata, user_feedback=claimed.user_feedback, artist_hint=claimed.artist_hint, folder_path=str(folder_path))
-                jobstore.approve(claimed.job_id, result)
-            else:
-                # Unknown classification; skip to avoid bad proposals
-                jobstore.update_latest_status_for_folder(folder_path, ["analyzing"], "skipped")
+                classification = label
+            _finish_analysis(
+                jobstore, analyzer, generator, claimed, folder_path, structure, classification, metadata_future
+            )
         except Exception as e:
+            logger.exception(f"Analysis failed for {folder_path}")
+            if metadata_future is not None:
+                metadata_future.cancel()
             jobstore.fail(claimed.job_id, e)
-            raise e
+    return True
 
-def run_move_worker(poll_seconds: int = 10):
-    jobstore = SQLiteJobStore()
-    from pathlib import Path as _P
+
+def _fan_out_collection(jobstore, analyzer, generator, claimed, folder_path, structure, metadata_future):
+    """Enqueue each album of an artist collection with an artist hint, then skip this job."""
+    if metadata_future is not None:
+        metadata_future.cancel()
+    # Subdirectories come from the analyzer's scandir listing, which already
+    # established they are directories, so no per-album stat is needed. It also
+    # counted their music recursively: artwork-only or empty folders are dropped
+    # here rather than after a metadata walk
+    candidates = [
+        Path(sub["path"]) if "path" in sub else folder_path / sub.get("name", "")
+        for sub in structure.get("subdirectories", [])
+        if sub.get("music_files", 1) > 0
+    ]
+    # One query for which albums are already tracked instead of one per album
+    tracked = jobstore.existing_folders(candidates)
+    album_dirs = [d for d in candidates if str(d) not in tracked]
+    # Each album reuses its share of the collection's file listing instead of
+    # walking its folder again; metadata extraction is I/O bound, so read the
+    # albums concurrently
+    sub_structures = analyzer.subfolder_structures(structure)
+    with ThreadPoolExecutor(max_workers=max(1, min(4, len(album_dirs)))) as executor:
+        album_metas = list(
+            executor.map(
+                lambda album_dir: analyzer.extract_folder_metadata(album_dir, sub_structures.get(str(album_dir))),
+                album_dirs,
+            )
+        )
+    # All albums of the collection go in one transaction rather than one each
+    jobstore.enqueue_many(
+        (album_dir, album_meta, folder_path.name, "analyze")
+        for album_dir, album_meta in zip(album_dirs, album_metas)
+        if album_meta.get("total_files", 0) > 0
+    )
+    jobstore.update_latest_status_for_folder(folder_path, ["analyzing"], "skipped")
+
+
+def _propose_album(jobstore, analyzer, generator, claimed, folder_path, structure, metadata_future):
+    """Generate a proposal for a single or multi-disc album and mark the job ready."""
+    if metadata_future is not None:
+        metadata = metadata_future.result()
+    else:
+        metadata = analyzer.extract_folder_metadata(folder_path, structure)
+    if metadata.get("total_files", 0) == 0:
+        jobstore.update_latest_status_for_folder(folder_path, ["analyzing"], "skipped")
+        return
+    job_meta = json.loads(claimed.metadata_json) if claimed.metadata_json else {}
+    result = generator.get_llm_proposal(
+        metadata,
+        user_feedback=claimed.user_feedback,
+        artist_hint=claimed.artist_hint,
+        folder_path=str(folder_path),
+        refresh=bool((job_meta or {}).get("reconsider")),
+    )
+    jobstore.approve(claimed.job_id, result)
+
+
+def _skip_unclassified(jobstore, analyzer, generator, claimed, folder_path, structure, metadata_future):
+    """Unknown classification; skip to avoid bad proposals."""
+    if metadata_future is not None:
+        metadata_future.cancel()
+    jobstore.update_latest_status_for_folder(folder_path, ["analyzing"], "skipped")
+
+
+# What the analyze worker does with each classification; anything else is skipped.
+# The keys are also the classifications a user override may name.
+_ANALYSIS_HANDLERS = {
+    "single_album": _propose_album,
+    "multi_disc_album": _propose_album,
+    "artist_collection": _fan_out_collection,
+}
+
+
+def _finish_analysis(jobstore, analyzer, generator, claimed, folder_path, structure, classification, metadata_future):
+    """Act on one classified folder: fan out a collection, or propose for an album."""
+    handler = _ANALYSIS_HANDLERS.get(classification, _skip_unclassified)
+    handler(jobstore, analyzer, generator, claimed, folder_path, structure, metadata_future)
+
+
+def _move_organizer(copy_mode: Optional[str] = None, preserve_stat: Optional[bool] = None):
     from .organizers import FileOrganizer as _FO
     # Target root from env
     target_dir = os.getenv("WTS_TARGET_DIR")
-    organizer = _FO(_P(target_dir) if target_dir else _P.cwd())
-    while True:
-        claimed = jobstore.claim_accepted_for_move()
-        if not claimed:
-            time.sleep(poll_seconds)
-            continue
+    return _FO(Path(target_dir) if target_dir else Path.cwd(), copy_mode=copy_mode, preserve_stat=preserve_stat)
+
+
+def _move_one(jobstore: SQLiteJobStore, organizer) -> bool:
+    """Organize one accepted job; False when none is waiting."""
+    claimed = jobstore.claim_accepted_for_move()
+    if not claimed:
+        return False
+    try:
+        metadata = json.loads(claimed.metadata_json)
+        # Expect proposal in metadata for move step
+        proposal = metadata.get("proposal") or {}
+        organizer.organize_folder(Path(claimed.folder_path), proposal)
+        jobstore.update_latest_status_for_folder(Path(claimed.folder_path), ["moving"], "completed")
+    except Exception as e:
+        job_id = jobstore.update_latest_status_for_folder(Path(claimed.folder_path), ["moving"], "error")
+        if job_id:
+            jobstore.fail(job_id, e)
+        raise e
+    return True
+
+
+def run_move_worker(
+    poll_seconds: int = 10, copy_mode: Optional[str] = None, preserve_stat: Optional[bool] = None, stop=None
+):
+    _pin_worker("io")
+    stop = stop or threading.Event()
+    jobstore = SQLiteJobStore()
+    organizer = _move_organizer(copy_mode, preserve_stat)
+    while not stop.is_set():
+        if not _move_one(jobstore, organizer):
+            _wait_for_change(jobstore, stop, poll_seconds)
+    organizer.close()
+    jobstore.close()
+
+
+def run_scan_move_worker(
+    poll_seconds: int = 10,
+    scan_seconds: int = 300,
+    copy_mode: Optional[str] = None,
+    preserve_stat: Optional[bool] = None,
+    stop=None,
+):
+    """Scan and move from one process: both are filesystem-bound and mostly idle.
+
+    Moves are picked up as soon as another connection commits, and polled at
+    least every poll_seconds; a scan pass runs at most every scan_seconds,
+    between moves.
+    """
+    _pin_worker("io")
+    stop = stop or threading.Event()
+    jobstore = SQLiteJobStore()
+    organizer = _move_organizer(copy_mode, preserve_stat)
+    known: Set[str] = set()
+    next_scan = time.monotonic()
+    logger = logging.getLogger("wts.worker")
+    while not stop.is_set():
+        if time.monotonic() >= next_scan:
+            try:
+                _scan_pass(jobstore, known)
+            except Exception:
+                logger.exception("Scan pass failed")
+            next_scan = time.monotonic() + scan_seconds
         try:
-            import json
-            metadata = json.loads(claimed.metadata_json)
-            # Expect proposal in metadata for move step
-            proposal = metadata.get("proposal") or {}
-            organizer.organize_folder(_P(claimed.folder_path), proposal)
-            jobstore.update_latest_status_for_folder(_P(claimed.folder_path), ["moving"], "completed")
-        except Exception as e:
-            job_id = jobstore.update_latest_status_for_folder(_P(claimed.folder_path), ["moving"], "error")
-            if job_id:
-                jobstore.fail(job_id, e)
-            raise e
+            moved = _move_one(jobstore, organizer)
+        except Exception:
+            # _move_one already marked the job error; one bad album must not stop
+            # the scanning this process also does
+            logger.exception("Move failed")
+            continue
+        if not moved:
+            _wait_for_change(jobstore, stop, max(0.0, min(poll_seconds, next_scan - time.monotonic())))
+    organizer.close()
+    jobstore.close()
+
 
 def _main():
     parser = argparse.ArgumentParser(description="Background workers for What's That Sound")
@@ -158,8 +395,39 @@ def _main():
 
     p_mv = sub.add_parser("move", help="Run mover worker")
     p_mv.add_argument("--poll-seconds", type=int, default=10)
+    p_mv.add_argument(
+        "--copy-mode",
+        choices=["copy", "reflink", "link"],
+        default=None,
+        help="copy files (default), clone them (reflink) or hardlink them; overrides WTS_COPY_MODE",
+    )
+    p_mv.add_argument(
+        "--no-preserve-stat",
+        dest="preserve_stat",
+        action="store_false",
+        default=None,
+        help="give copies the current time instead of the source's timestamps and mode; overrides WTS_PRESERVE_STAT",
+    )
     p_mv.add_argument("--reload", action="store_true", help="Restart on code changes (dev)")
 
+    p_sm = sub.add_parser("scan-move", help="Run scanner and mover in one worker")
+    p_sm.add_argument("--poll-seconds", type=int, default=10)
+    p_sm.add_argument("--scan-seconds", type=int, default=300, help="Seconds between scan passes")
+    p_sm.add_argument(
+        "--copy-mode",
+        choices=["copy", "reflink", "link"],
+        default=None,
+        help="copy files (default), clone them (reflink) or hardlink them; overrides WTS_COPY_MODE",
+    )
+    p_sm.add_argument(
+        "--no-preserve-stat",
+        dest="preserve_stat",
+        action="store_false",
+        default=None,
+        help="give copies the current time instead of the source's timestamps and mode; overrides WTS_PRESERVE_STAT",
+    )
+    p_sm.add_argument("--reload", action="store_true", help="Restart on code changes (dev)")
+
     args = parser.parse_args()
 
     def start_once():
@@ -168,7 +436,16 @@ def _main():
         elif args.role == "analyze":
             run_analyze_worker(poll_seconds=args.poll_seconds)
         elif args.role == "move":
-            run_move_worker(poll_seconds=args.poll_seconds)
+            run_move_worker(
+                poll_seconds=args.poll_seconds, copy_mode=args.copy_mode, preserve_stat=args.preserve_stat
+            )
+        elif args.role == "scan-move":
+            run_scan_move_worker(
+                poll_seconds=args.poll_seconds,
+                scan_seconds=args.scan_seconds,
+                copy_mode=args.copy_mode,
+                preserve_stat=args.preserve_stat,
+            )
 
     if getattr(args, "reload", False):
         try:
@@ -177,6 +454,12 @@ def _main():
             src_dir = os.path.dirname(os.path.dirname(__file__))
             # Re-run without --reload in child process to avoid recursion
             cmd = [sys.executable, "-m", "src.worker", args.role, "--poll-seconds", str(args.poll_seconds)]
+            if getattr(args, "scan_seconds", None):
+                cmd += ["--scan-seconds", str(args.scan_seconds)]
+            if getattr(args, "copy_mode", None):
+                cmd += ["--copy-mode", args.copy_mode]
+            if getattr(args, "preserve_stat", None) is False:
+                cmd += ["--no-preserve-stat"]
             run_process(src_dir, cmd)
             return
         except Exception:
@@ -136,8 +136,8 @@ class TestDirectoryAnalyzer:
         test_folder.mkdir()
 
         # Mock permission error
-        with patch.object(
-            Path, "iterdir", side_effect=PermissionError("Access denied")
+        with patch(
+            "src.analyzers.directory_analyzer.os.scandir", side_effect=PermissionError("Access denied")
         ):
             analysis = analyzer.analyze_directory_structure(test_folder)
 
@@ -159,3 +159,111 @@ class TestDirectoryAnalyzer:
 
             mock_extract.assert_called_once_with(test_folder)
             assert result == {"test": "metadata"}
+
+    def test_count_music_recursive(self, analyzer, tmp_path):
+        """One traversal yields the recursive count, basenames and direct child dirs."""
+        (tmp_path / "CD1" / "bonus").mkdir(parents=True)
+        (tmp_path / "Scans").mkdir()
+        (tmp_path / "01.FLAC").write_bytes(b"")
+        (tmp_path / "CD1" / "01.mp3").write_bytes(b"")
+        (tmp_path / "CD1" / "bonus" / "02.mp3").write_bytes(b"")
+        (tmp_path / "Scans" / "front.jpg").write_bytes(b"")
+
+        count, basenames, child_dirs = analyzer._count_music_recursive(str(tmp_path))
+
+        assert count == 3
+        assert basenames == {"01.flac", "01.mp3", "02.mp3"}
+        assert sorted(child_dirs) == ["CD1", "Scans"]
+
+    def test_directory_tree_is_capped_or_skipped(self, analyzer, tmp_path):
+        """Large folders render at most TREE_MAX_NODES lines; render_tree=False keeps only counts."""
+        for i in range(analyzer.TREE_MAX_NODES + 10):
+            (tmp_path / f"{i:03d}.mp3").write_bytes(b"")
+
+        analysis = analyzer.analyze_directory_structure(tmp_path)
+        lines = analysis["directory_tree"].splitlines()
+        assert len(lines) == analyzer.TREE_MAX_NODES + 1
+        assert lines[-1] == "... (truncated)"
+        assert analysis["total_music_files"] == analyzer.TREE_MAX_NODES + 10
+
+        counts_only = analyzer.analyze_directory_structure(tmp_path, render_tree=False)
+        assert counts_only["directory_tree"] == ""
+        assert counts_only["total_music_files"] == analyzer.TREE_MAX_NODES + 10
+
+    def test_extract_folder_metadata_reuses_structure_listing(self, analyzer, tmp_path):
+        """Given the structure analysis, metadata extraction does not list the folder again."""
+        (tmp_path / "CD1").mkdir()
+        (tmp_path / "01.mp3").write_bytes(b"")
+        (tmp_path / "CD1" / "02.flac").write_bytes(b"")
+        (tmp_path / "cover.jpg").write_bytes(b"")
+
+        structure = analyzer.analyze_directory_structure(tmp_path, render_tree=False)
+        assert sorted(structure["music_file_paths"]) == [
+            str(tmp_path / "01.mp3"),
+            str(tmp_path / "CD1" / "02.flac"),
+        ]
+
+        with patch("src.metadata.os.scandir", side_effect=AssertionError("walked again")):
+            metadata = analyzer.extract_folder_metadata(tmp_path, structure)
+
+        assert metadata["total_files"] == 2
+        assert [f["relative_path"] for f in metadata["files"]] == ["01.mp3", str(Path("CD1") / "02.flac")]
+        assert metadata["subdirectories"] == ["CD1"]
+
+    def test_extract_folder_metadata_rereads_changed_files(self, analyzer, tmp_path):
+        """Unchanged files reuse their tags; new files in subfolders and retagged files are read."""
+        import os
+
+        (tmp_path / "CD1").mkdir()
+        (tmp_path / "CD1" / "01.mp3").write_bytes(b"x")
+        extractor = analyzer.metadata_extractor
+
+        with patch.object(extractor, "_extract_generic", return_value={"title": "One"}) as read_tags:
+            assert analyzer.extract_folder_metadata(tmp_path)["total_files"] == 1
+            analyzer.extract_folder_metadata(tmp_path)
+            assert read_tags.call_count == 1
+
+            (tmp_path / "CD1" / "02.mp3").write_bytes(b"x")
+            assert analyzer.extract_folder_metadata(tmp_path)["total_files"] == 2
+            assert read_tags.call_count == 2
+
+            track = tmp_path / "CD1" / "01.mp3"
+            stat = os.stat(track)
+            os.utime(track, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            analyzer.extract_folder_metadata(tmp_path)
+            assert read_tags.call_count == 3
+
+    def test_structure_analysis_sees_changes_inside_subfolders(self, analyzer, tmp_path):
+        """Tracks added to disc folders are counted even though the parent's mtime is unchanged."""
+        for disc in ("CD1", "CD2"):
+            (tmp_path / disc).mkdir()
+            (tmp_path / disc / "01.mp3").write_bytes(b"")
+        assert analyzer.analyze_directory_structure(tmp_path)["total_music_files"] == 2
+
+        for disc in ("CD1", "CD2"):
+            (tmp_path / disc / "02.mp3").write_bytes(b"")
+        assert analyzer.analyze_directory_structure(tmp_path)["total_music_files"] == 4
+
+    def test_subfolder_structures_reuse_collection_listing(self, analyzer, tmp_path):
+        """Each album gets its slice of the parent's listing; symlinked albums are left out."""
+        for album in ("Album A/CD1", "Album B"):
+            (tmp_path / album).mkdir(parents=True)
+        (tmp_path / "Album A" / "CD1" / "01.mp3").write_bytes(b"")
+        (tmp_path / "Album B" / "01.flac").write_bytes(b"")
+        (tmp_path / "Album B" / "02.flac").write_bytes(b"")
+        (tmp_path / "Linked").symlink_to(tmp_path / "Album B")
+
+        structure = analyzer.analyze_directory_structure(tmp_path, render_tree=False)
+        subs = analyzer.subfolder_structures(structure)
+
+        assert set(subs) == {str(tmp_path / "Album A"), str(tmp_path / "Album B")}
+        album_b = subs[str(tmp_path / "Album B")]
+        assert sorted(album_b["music_file_paths"]) == [
+            str(tmp_path / "Album B" / "01.flac"),
+            str(tmp_path / "Album B" / "02.flac"),
+        ]
+
+        with patch("src.metadata.os.scandir", side_effect=AssertionError("walked again")):
+            metadata = analyzer.extract_folder_metadata(tmp_path / "Album A", subs[str(tmp_path / "Album A")])
+        assert [f["relative_path"] for f in metadata["files"]] == [str(Path("CD1") / "01.mp3")]
+        assert metadata["subdirectories"] == ["CD1"]
@@ -204,3 +204,202 @@ class TestStructureClassifier:
         assert "single_album" in prompt
         assert "multi_disc_album" in prompt
         assert "artist_collection" in prompt
+
+
+def test_llm_classifications_are_cached_by_prompt():
+    """Only valid LLM answers are cached; a repeat is served without inference."""
+    from unittest.mock import Mock
+
+    inference = Mock()
+    inference.model = "test-model"
+    inference.generate.return_value = "artist_collection"
+    structure = {
+        "folder_name": "Artist",
+        "total_music_files": 20,
+        "direct_music_files": 0,
+        "subdirectories": [
+            {"name": "First Album", "music_files": 10, "subdirectories": []},
+            {"name": "Second Album", "music_files": 10, "subdirectories": []},
+        ],
+        "max_depth": 1,
+        "directory_tree": "tree",
+    }
+
+    assert StructureClassifier(inference).classify_directory_structure(structure) == "artist_collection"
+    assert StructureClassifier(inference).classify_directory_structure(structure) == "artist_collection"
+    assert inference.generate.call_count == 1
+
+    inference.generate.return_value = "no idea"
+    structure["folder_name"] = "Other"
+    StructureClassifier(inference).classify_directory_structure(structure)
+    StructureClassifier(inference).classify_directory_structure(structure)
+    assert inference.generate.call_count == 3
+
+
+def test_classification_prompt_omits_directory_tree():
+    """The rendered tree is not sent; the summary fields describe the structure."""
+    from unittest.mock import Mock
+
+    structure = {
+        "folder_name": "Album",
+        "total_music_files": 2,
+        "direct_music_files": 2,
+        "subdirectories": [],
+        "max_depth": 0,
+        "directory_tree": "├── 01 - some very long track title.flac",
+    }
+
+    prompt = StructureClassifier(Mock()).build_classification_prompt(structure)
+
+    assert "some very long track title" not in prompt
+    assert "Direct Music Files (in root): 2" in prompt
+
+
+def test_confident_heuristics_skip_the_llm():
+    """Loose tracks only, or plain disc folders only, are classified without inference."""
+    from unittest.mock import Mock
+
+    inference = Mock()
+    classifier = StructureClassifier(inference)
+    loose = {
+        "folder_name": "Album",
+        "total_music_files": 12,
+        "direct_music_files": 12,
+        "subdirectories": [],
+        "max_depth": 0,
+        "directory_tree": "",
+    }
+    discs = {
+        "folder_name": "Album",
+        "total_music_files": 20,
+        "direct_music_files": 0,
+        "subdirectories": [
+            {"name": "CD1", "music_files": 10, "subdirectories": []},
+            {"name": "Disc 2", "music_files": 10, "subdirectories": []},
+        ],
+        "max_depth": 1,
+        "directory_tree": "",
+    }
+
+    assert classifier.classify_directory_structure(loose) == "single_album"
+    assert classifier.classify_directory_structure(discs) == "multi_disc_album"
+    inference.generate.assert_not_called()
+
+    inference.generate.return_value = "artist_collection"
+    discs["subdirectories"][1]["name"] = "Live in Paris"
+    assert classifier.classify_directory_structure(discs) == "artist_collection"
+    inference.generate.assert_called_once()
+
+
+def test_classify_batch_sends_uncertain_folders_in_one_prompt():
+    """Confident folders skip inference; the rest share one call and fall back on bad answers."""
+    from unittest.mock import Mock
+
+    def collection(name):
+        return {
+            "folder_name": name,
+            "total_music_files": 20,
+            "direct_music_files": 0,
+            "subdirectories": [
+                {"name": "First Album", "music_files": 10, "subdirectories": []},
+                {"name": "Second Album", "music_files": 10, "subdirectories": []},
+            ],
+            "max_depth": 1,
+            "directory_tree": "",
+        }
+
+    loose = {
+        "folder_name": "Album",
+        "total_music_files": 3,
+        "direct_music_files": 3,
+        "subdirectories": [],
+        "max_depth": 0,
+        "directory_tree": "",
+    }
+    inference = Mock()
+    inference.model = "test-model"
+    inference.generate.return_value = '{"classifications": ["multi_disc_album", "nonsense"]}'
+    classifier = StructureClassifier(inference)
+
+    labels = classifier.classify_batch([collection("One"), loose, collection("Two")])
+
+    assert labels == ["multi_disc_album", "single_album", "artist_collection"]
+    inference.generate.assert_called_once()
+    prompt = inference.generate.call_args.args[0]
+    assert "Folder Name: One" in prompt and "Folder Name: Two" in prompt
+    assert "Folder Name: Album" not in prompt
+
+    # The valid answer was cached per folder; a wrong-length reply falls back per folder
+    inference.generate.return_value = '{"classifications": []}'
+    assert classifier.classify_batch([collection("One"), collection("Three"), collection("Four")])[0] == "multi_disc_album"
+
+
+def test_refresh_skips_the_cached_classification():
+    """A reconsidered folder is classified by the LLM again; the new label is cached."""
+    from unittest.mock import Mock
+
+    inference = Mock()
+    inference.model = "test-model"
+    inference.generate.return_value = "artist_collection"
+    structure = {
+        "folder_name": "Reconsidered",
+        "total_music_files": 20,
+        "direct_music_files": 0,
+        "subdirectories": [
+            {"name": "First Album", "music_files": 10, "subdirectories": []},
+            {"name": "Second Album", "music_files": 10, "subdirectories": []},
+        ],
+        "max_depth": 1,
+        "directory_tree": "",
+    }
+    StructureClassifier(inference).classify_directory_structure(structure)
+
+    inference.generate.return_value = "multi_disc_album"
+    assert StructureClassifier(inference).classify_directory_structure(structure, refresh=True) == "multi_disc_album"
+    assert StructureClassifier(inference).classify_directory_structure(structure) == "multi_disc_album"
+    assert inference.generate.call_count == 2
+
+
+def test_prompt_cache_expires_and_is_bounded(tmp_path):
+    import os
+    import time
+
+    from src.inference import PromptCache
+
+    cache = PromptCache(tmp_path, "m", max_age_seconds=60, max_entries=2)
+    for i in range(3):
+        cache.put(f"prompt {i}", i)
+        old = time.time() - 10 + i
+        os.utime(cache.path_for(f"prompt {i}"), (old, old))
+    cache.put("prompt 3", 3)
+
+    assert len(list(tmp_path.glob("*.json"))) == 2
+    assert cache.get("prompt 0") is None and cache.get("prompt 1") is None
+    assert cache.get("prompt 3") == 3
+
+    stale = time.time() - 120
+    os.utime(cache.path_for("prompt 3"), (stale, stale))
+    assert cache.get("prompt 3") is None
+
+
+def test_prompt_cache_lists_its_directory_only_when_full(tmp_path, monkeypatch):
+    import os
+
+    from src import inference
+    from src.inference import PromptCache
+
+    listings = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(inference.os, "scandir", lambda path: listings.append(path) or real_scandir(path))
+
+    cache = PromptCache(tmp_path, "m", max_entries=10)
+    for i in range(10):
+        cache.put(f"prompt {i}", i)
+    # Counted once on the first write, then tracked without listing
+    assert len(listings) == 1
+
+    # Past the limit, one listing prunes to 90% and the next writes are free again
+    cache.put("prompt 10", 10)
+    cache.put("prompt 11", 11)
+    assert len(listings) == 2
+    assert len(list(tmp_path.glob("*.json"))) == 10
@@ -18,3 +18,10 @@ def _isolate_sqlite_db(tmp_path_factory):
     db_dir = tmp_path_factory.mktemp("wts_db")
     os.environ["WTS_DB_PATH"] = str(db_dir / "tests.sqlite")
     yield
+
+
+@pytest.fixture(autouse=True)
+def _isolate_proposal_cache(tmp_path, monkeypatch):
+    """Give each test its own LLM caches so cached answers never leak between tests."""
+    monkeypatch.setenv("WTS_PROPOSAL_CACHE_DIR", str(tmp_path / "proposal_cache"))
+    monkeypatch.setenv("WTS_CLASSIFICATION_CACHE_DIR", str(tmp_path / "classification_cache"))
@@ -172,3 +172,16 @@ class TestJsonParsingFix:
         assert proposal["release_type"] == "Album"  # Default since not compilation
         assert proposal["confidence"] == "low"  # Fallback confidence
         assert "LLM unavailable" in proposal["reasoning"]
+
+    def test_json_followed_by_braced_prose(self, generator):
+        """Braces in trailing prose do not break extraction of the JSON object."""
+        text = (
+            'Result: {"artist": "A", "album": "B", "year": "2001", '
+            '"release_type": "Album", "extra": {"nested": "}"}}\n'
+            "Note: folder names like {disc} were ignored."
+        )
+
+        proposal = generator._parse_llm_response(text)
+
+        assert proposal["album"] == "B"
+        assert proposal["extra"] == {"nested": "}"}
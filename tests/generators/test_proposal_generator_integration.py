@@ -347,3 +347,38 @@ class TestProposalGeneratorIntegration:
         assert "release_type" in prompt
         assert "confidence" in prompt
         assert "reasoning" in prompt
+
+
+def test_llm_proposals_are_cached_by_prompt():
+    """A repeated request is answered from the on-disk cache without calling the LLM."""
+    inference = Mock()
+    inference.generate.return_value = (
+        '{"artist": "A", "album": "B", "year": "2001", "release_type": "Album"}'
+    )
+    metadata = {"folder_name": "B", "total_files": 1, "files": [], "analysis": {}}
+
+    first = ProposalGenerator(inference).get_llm_proposal(metadata, folder_path="/music/B")
+    second = ProposalGenerator(inference).get_llm_proposal(metadata, folder_path="/music/B")
+    ProposalGenerator(inference).get_llm_proposal(metadata, user_feedback="wrong year", folder_path="/music/B")
+
+    assert first == second == {"artist": "A", "album": "B", "year": "2001", "release_type": "Album"}
+    assert inference.generate.call_count == 2
+
+
+def test_refresh_asks_the_llm_again_and_replaces_the_cached_proposal():
+    """Reconsidering without new feedback must not get the cached answer back."""
+    inference = Mock()
+    inference.generate.return_value = (
+        '{"artist": "A", "album": "B", "year": "2001", "release_type": "Album"}'
+    )
+    metadata = {"folder_name": "R", "total_files": 1, "files": [], "analysis": {}}
+    ProposalGenerator(inference).get_llm_proposal(metadata, folder_path="/music/R")
+
+    inference.generate.return_value = (
+        '{"artist": "A", "album": "B", "year": "2002", "release_type": "Album"}'
+    )
+    refreshed = ProposalGenerator(inference).get_llm_proposal(metadata, folder_path="/music/R", refresh=True)
+    cached = ProposalGenerator(inference).get_llm_proposal(metadata, folder_path="/music/R")
+
+    assert refreshed["year"] == cached["year"] == "2002"
+    assert inference.generate.call_count == 2
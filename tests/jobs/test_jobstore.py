@@ -26,3 +26,237 @@ def test_jobstore_enqueue_and_complete(tmp_path, monkeypatch):
     assert got == result
 
 
+def test_jobstore_enqueue_many_and_existing_folders(tmp_path):
+    store = SQLiteJobStore(db_path=str(tmp_path / "test.db"))
+    a, b, c = tmp_path / "a", tmp_path / "b", tmp_path / "c"
+
+    inserted = store.enqueue_many(
+        [
+            (a, {"folder_name": "a"}, None, "analyze"),
+            (b, {"folder_name": "b"}, "Artist", "analyze"),
+        ]
+    )
+    assert inserted == 2
+    assert store.enqueue_many([]) == 0
+    assert store.counts()["queued"] == 2
+    assert store.existing_folders([a, b, c]) == {str(a), str(b)}
+
+
+def test_jobstore_folders_under_matches_prefix_only(tmp_path):
+    store = SQLiteJobStore(db_path=str(tmp_path / "test.db"))
+    base = tmp_path / "music"
+    store.enqueue_many(
+        [
+            (base, {}, None, "scan"),
+            (base / "Album", {}, None, "analyze"),
+            (base / "Artist" / "CD1", {}, None, "analyze"),
+            (tmp_path / "music-other" / "Album", {}, None, "analyze"),
+        ]
+    )
+    assert store.folders_under(base) == {str(base), str(base / "Album"), str(base / "Artist" / "CD1")}
+
+
+def test_has_any_for_folder_active_statuses(tmp_path):
+    store = SQLiteJobStore(db_path=str(tmp_path / "test.db"))
+    folder = tmp_path / "album"
+    job_id = store.enqueue(folder, {})
+    store.fail(job_id, Exception("boom"))
+
+    assert store.has_any_for_folder(folder)
+    assert store.has_any_for_folder(folder, ["error"])
+    assert not store.has_any_for_folder(folder, ["queued", "analyzing", "ready"])
+
+
+def test_enqueue_is_idempotent_for_active_jobs(tmp_path):
+    store = SQLiteJobStore(db_path=str(tmp_path / "test.db"))
+    folder = tmp_path / "album"
+
+    first = store.enqueue(folder, {})
+    assert store.enqueue(folder, {}) == first
+    assert store.enqueue_many([(folder, {}, None, "analyze")]) == 0
+    assert store.counts()["queued"] == 1
+
+
+def test_enqueue_raises_on_rows_the_schema_rejects(tmp_path):
+    import sqlite3
+
+    import pytest
+
+    store = SQLiteJobStore(db_path=str(tmp_path / "test.db"))
+
+    # Only the active-job unique index is ignored; a NOT NULL failure is reported
+    with pytest.raises(sqlite3.IntegrityError):
+        store.enqueue(tmp_path / "album", {}, job_type=None)
+    with pytest.raises(sqlite3.IntegrityError):
+        store.enqueue_many([(tmp_path / "album", {}, None, None)])
+    assert store.enqueue(tmp_path / "album", {}) == 1
+
+
+def test_recent_jobs_returns_field_dicts(tmp_path: Path):
+    store = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite"))
+    job_id = store.enqueue(tmp_path / "album", {"folder_name": "album"})
+
+    (job,) = store.recent_jobs(limit=5)
+
+    assert job["id"] == job_id and isinstance(job["id"], int)
+    assert job["folder_path"] == str(tmp_path / "album")
+    assert (job["status"], job["job_type"], job["error"]) == ("queued", "analyze", None)
+    assert set(job) == {"id", "folder_path", "status", "job_type", "error", "created_at", "updated_at"}
+
+
+def test_snapshot_matches_separate_queries(tmp_path: Path):
+    store = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite"))
+    first = store.enqueue(tmp_path / "a", {})
+    store.enqueue(tmp_path / "b", {})
+    store.claim_queued_for_analysis()
+    store.approve(first, {"artist": "A"})
+
+    snapshot = store.snapshot(ready_limit=10, recent_limit=10)
+
+    assert snapshot.counts == store.counts()
+    assert snapshot.ready == store.fetch_ready(limit=10)
+    assert snapshot.recent == store.recent_jobs(limit=10)
+    assert store.snapshot().ready == [] and store.snapshot().recent == []
+
+
+def test_fetch_ready_for_returns_latest_ready_per_folder(tmp_path: Path):
+    store = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite"))
+    ready_folder, queued_folder = tmp_path / "ready", tmp_path / "queued"
+    job_id = store.enqueue(ready_folder, {})
+    store.claim_queued_for_analysis()
+    store.approve(job_id, {"artist": "A"})
+    store.enqueue(queued_folder, {})
+
+    results = store.fetch_ready_for([ready_folder, queued_folder, tmp_path / "unknown"])
+
+    assert results == {str(ready_folder): {"artist": "A"}}
+    assert store.fetch_ready_for([]) == {}
+
+
+def test_wait_for_result_sees_commits_from_other_connections(tmp_path: Path):
+    import threading
+
+    db = str(tmp_path / "jobs.sqlite")
+    waiter = SQLiteJobStore(db_path=db)
+    folder = tmp_path / "Album"
+    job_id = waiter.enqueue(folder, {})
+
+    assert waiter.wait_for_result(folder, timeout=0.05, poll_interval=0.01) is None
+
+    # The worker writes through its own store, as a separate process would
+    timer = threading.Timer(0.05, SQLiteJobStore(db_path=db).approve, args=(job_id, {"album": "A"}))
+    timer.start()
+    try:
+        assert waiter.wait_for_result(folder, timeout=5.0, poll_interval=0.01) == {"album": "A"}
+    finally:
+        timer.cancel()
+
+
+def test_connections_are_reused_per_thread(tmp_path: Path):
+    import threading
+
+    store = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite"))
+    conn = store._connect()
+    assert store._connect() is conn
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(store._connect()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+    # A failed transaction is rolled back, leaving the shared connection usable
+    try:
+        with store._connect() as c:
+            c.execute("BEGIN IMMEDIATE;")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    store.enqueue(tmp_path / "Album", {})
+    assert store.counts()["queued"] == 1
+
+
+def test_close_closes_every_threads_connection(tmp_path: Path):
+    import sqlite3
+    import threading
+
+    import pytest
+
+    store = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite"))
+    conn = store._connect()
+    other = []
+    thread = threading.Thread(target=lambda: other.append(store._connect()))
+    thread.start()
+    thread.join()
+
+    store.close()
+
+    for closed in (conn, other[0]):
+        with pytest.raises(sqlite3.ProgrammingError):
+            closed.execute("SELECT 1")
+    # The store stays usable; the next call opens a fresh connection
+    store.enqueue(tmp_path / "Album", {})
+    assert store.counts()["queued"] == 1
+
+
+def test_enqueue_many_skip_tracked_ignores_finished_folders(tmp_path: Path):
+    store = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite"))
+    done, new = tmp_path / "done", tmp_path / "new"
+    job_id = store.enqueue(done, {})
+    store.approve(job_id, {})
+    store.update_latest_status_for_folder(done, ["ready"], "completed")
+
+    rows = [(done, {}, None, "analyze"), (new, {}, None, "analyze")]
+    assert store.enqueue_many(rows, skip_tracked=True) == 1
+    assert store.enqueue_many(rows, skip_tracked=True) == 0
+    # Without skip_tracked only active jobs block a row, so the completed folder is re-queued
+    assert store.enqueue_many(rows) == 1
+
+
+def test_data_version_changes_only_on_other_connections_commits(tmp_path: Path):
+    db = str(tmp_path / "jobs.sqlite")
+    reader = SQLiteJobStore(db_path=db)
+    version = reader.data_version()
+
+    reader.counts()
+    assert reader.data_version() == version
+
+    SQLiteJobStore(db_path=db).enqueue(tmp_path / "Album", {})
+    assert reader.data_version() != version
+
+
+def test_ready_list_is_read_in_index_order(tmp_path: Path):
+    store = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite"))
+    with store._connect() as conn:
+        plan = " ".join(
+            row[-1]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id, folder_path, result_json FROM jobs WHERE status='ready' ORDER BY completed_at DESC LIMIT 3"
+            )
+        )
+    assert "idx_jobs_status_completed" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_schema_is_checked_once_per_database_file(tmp_path: Path, monkeypatch):
+    import src.jobs as jobs
+
+    db = tmp_path / "jobs.sqlite"
+    calls = []
+    real_ensure_schema = jobs.ensure_schema
+    monkeypatch.setattr(jobs, "ensure_schema", lambda conn: calls.append(1) or real_ensure_schema(conn))
+
+    SQLiteJobStore(db_path=str(db))
+    store = SQLiteJobStore(db_path=str(db))
+    assert len(calls) == 1
+    # Writes and checkpoints change the file, not which file it is
+    store.enqueue(tmp_path / "Album", {})
+    store._connect().execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    SQLiteJobStore(db_path=str(db))
+    assert len(calls) == 1
+
+    # A recreated file is a new database and gets its schema again; store still
+    # holds the old file open, so the new one cannot reuse its inode
+    db.unlink()
+    SQLiteJobStore(db_path=str(db)).enqueue(tmp_path / "Album", {})
+    assert len(calls) == 2
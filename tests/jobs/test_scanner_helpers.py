@@ -0,0 +1,90 @@
+from pathlib import Path
+
+from src.jobs.scanner import _count_music_up_to, _dir_has_music_anywhere, iter_scan_decisions
+
+
+def test_dir_has_music_anywhere_memoizes_by_path(tmp_path: Path):
+    album = tmp_path / "album" / "CD1"
+    album.mkdir(parents=True)
+    (album / "01.flac").write_bytes(b"")
+
+    cache = {}
+    assert _dir_has_music_anywhere(tmp_path / "album", cache) is True
+    assert cache == {str(tmp_path / "album"): True}
+
+    # A cached answer is served without walking the tree again
+    (album / "01.flac").unlink()
+    assert _dir_has_music_anywhere(tmp_path / "album", cache) is True
+    assert _dir_has_music_anywhere(tmp_path / "album") is False
+
+
+def test_perform_scan_is_idempotent(tmp_path: Path):
+    from src.jobs import SQLiteJobStore
+    from src.jobs.scanner import perform_scan
+
+    base = tmp_path / "src"
+    for album in ("Album A", "Album B/CD1", "Album B/CD2", "Single"):
+        (base / album).mkdir(parents=True)
+        (base / album / "01.mp3").write_bytes(b"")
+
+    store = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite"))
+    perform_scan(store, base)
+    perform_scan(store, base)
+
+    assert store.counts()["queued"] == 3
+    assert store.folders_under(base) == {
+        str(base / "Album A"),
+        str(base / "Album B"),
+        str(base / "Single"),
+    }
+
+
+def test_count_music_up_to_stops_at_limit(tmp_path: Path):
+    disc = tmp_path / "CD1"
+    disc.mkdir()
+    for i in range(5):
+        (disc / f"{i:02d}.mp3").write_bytes(b"")
+    (disc / "cover.jpg").write_bytes(b"")
+
+    assert _count_music_up_to(disc, 3) == 3
+    assert _count_music_up_to(disc, 100) == 5
+
+
+def test_iter_scan_decisions_yields_rows_and_skips_tracked(tmp_path: Path):
+    for album in ("Artist/Album A", "Artist/Album B", "Single"):
+        (tmp_path / album).mkdir(parents=True)
+        (tmp_path / album / "01.mp3").write_bytes(b"")
+
+    tracked = {str(tmp_path / "Single")}
+    rows = list(iter_scan_decisions(tmp_path, tracked))
+
+    assert rows == [
+        (tmp_path / "Artist" / "Album A", {"folder_name": "Album A"}, "Artist", "analyze"),
+        (tmp_path / "Artist" / "Album B", {"folder_name": "Album B"}, "Artist", "analyze"),
+    ]
+    assert str(tmp_path / "Artist" / "Album A") in tracked
+
+
+def test_iter_scan_decisions_skips_organized_folders(tmp_path: Path):
+    from src.trackers.state_manager import TRACKER_FILENAME
+
+    for album in ("Done", "Todo"):
+        (tmp_path / album).mkdir()
+        (tmp_path / album / "01.mp3").write_bytes(b"")
+    (tmp_path / "Done" / TRACKER_FILENAME).write_text("{}")
+
+    assert [row[0] for row in iter_scan_decisions(tmp_path)] == [tmp_path / "Todo"]
+
+
+def test_iter_scan_decisions_pool_keeps_serial_order(tmp_path: Path, monkeypatch):
+    for album in ("B Artist/Album 2", "B Artist/Album 1", "A Single", "C Multi/CD1", "C Multi/CD2"):
+        (tmp_path / album).mkdir(parents=True)
+        (tmp_path / album / "01.mp3").write_bytes(b"")
+
+    monkeypatch.setenv("WTS_SCAN_THREADS", "1")
+    serial = list(iter_scan_decisions(tmp_path))
+    monkeypatch.setenv("WTS_SCAN_THREADS", "4")
+    pooled = list(iter_scan_decisions(tmp_path))
+
+    assert pooled == serial
+    assert [row[0].name for row in pooled] == ["A Single", "Album 1", "Album 2", "C Multi"]
@@ -0,0 +1 @@
+"""Test package for organizer components."""
@@ -0,0 +1,207 @@
+"""Tests for the FileOrganizer class."""
+
+import os
+import pytest
+
+from src.organizers.file_organizer import FileOrganizer, _copy_file
+
+
+class TestFileOrganizer:
+    """Test cases for FileOrganizer class."""
+
+    @pytest.fixture
+    def organizer(self, tmp_path):
+        """Create a FileOrganizer targeting a temporary directory."""
+        return FileOrganizer(tmp_path / "target")
+
+    def test_organize_folder_copies_music_tree(self, organizer, tmp_path):
+        """Music files are copied with their relative layout; other files are left behind."""
+        source = tmp_path / "source"
+        (source / "CD2").mkdir(parents=True)
+        (source / "01.flac").write_bytes(b"flac-data")
+        (source / "02.MP3").write_bytes(b"mp3-data")
+        (source / "CD2" / "01.ogg").write_bytes(b"ogg-data")
+        (source / "cover.jpg").write_bytes(b"jpg")
+
+        proposal = {"artist": "AC/DC", "album": "Live", "year": "1992"}
+        copied = organizer.organize_folder(source, proposal)
+
+        album_dir = tmp_path / "target" / "AC_DC" / "Live (1992)"
+        assert copied == 3
+        assert (album_dir / "01.flac").read_bytes() == b"flac-data"
+        assert (album_dir / "02.MP3").read_bytes() == b"mp3-data"
+        assert (album_dir / "CD2" / "01.ogg").read_bytes() == b"ogg-data"
+        assert not (album_dir / "cover.jpg").exists()
+
+    def test_organize_folder_preserves_mtime(self, organizer, tmp_path):
+        """Copies keep the source modification time like shutil.copy2."""
+        source = tmp_path / "source"
+        source.mkdir()
+        track = source / "01.flac"
+        track.write_bytes(b"x" * 4096)
+        os.utime(track, (1_000_000_000, 1_000_000_000))
+
+        organizer.organize_folder(source, {"artist": "A", "album": "B", "year": "2000"})
+
+        copy = tmp_path / "target" / "A" / "B (2000)" / "01.flac"
+        assert copy.stat().st_mtime == 1_000_000_000
+
+    def test_organize_folder_without_preserve_stat(self, tmp_path):
+        """Skipping copystat still copies the bytes; the copy gets a fresh mtime."""
+        source = tmp_path / "source"
+        source.mkdir()
+        track = source / "01.flac"
+        track.write_bytes(b"x" * 4096)
+        os.utime(track, (1_000_000_000, 1_000_000_000))
+
+        organizer = FileOrganizer(tmp_path / "target", preserve_stat=False)
+        organizer.organize_folder(source, {"artist": "A", "album": "B", "year": "2000"})
+
+        copy = tmp_path / "target" / "A" / "B (2000)" / "01.flac"
+        assert copy.read_bytes() == b"x" * 4096
+        assert copy.stat().st_mtime != 1_000_000_000
+
+    def test_rerun_skips_files_already_in_place(self, organizer, tmp_path, monkeypatch):
+        """A second run leaves unchanged files alone but recopies ones that changed."""
+        source = tmp_path / "source"
+        source.mkdir()
+        (source / "01.flac").write_bytes(b"one")
+        (source / "02.flac").write_bytes(b"two")
+        proposal = {"artist": "A", "album": "B", "year": "2000"}
+        assert organizer.organize_folder(source, proposal) == 2
+
+        (source / "02.flac").write_bytes(b"two, retagged")
+        copied = []
+        monkeypatch.setattr(
+            "src.organizers.file_organizer._copy_file",
+            lambda src, dst, *args: copied.append(os.path.basename(src)) or _copy_file(src, dst, *args),
+        )
+
+        assert organizer.organize_folder(source, proposal) == 2
+        assert copied == ["02.flac"]
+        assert (tmp_path / "target" / "A" / "B (2000)" / "02.flac").read_bytes() == b"two, retagged"
+
+    def test_rerun_replaces_a_newer_file_of_the_same_size(self, organizer, tmp_path):
+        """Only an exact size and mtime match counts as already copied."""
+        source = tmp_path / "source"
+        source.mkdir()
+        (source / "01.flac").write_bytes(b"new")
+        target = tmp_path / "target" / "A" / "B (2000)" / "01.flac"
+        target.parent.mkdir(parents=True)
+        target.write_bytes(b"old")
+        later = (source / "01.flac").stat().st_mtime + 100
+        os.utime(target, (later, later))
+
+        organizer.organize_folder(source, {"artist": "A", "album": "B", "year": "2000"})
+
+        assert target.read_bytes() == b"new"
+
+    def test_first_copy_skips_target_stats_and_keeps_mode(self, organizer, tmp_path, monkeypatch):
+        """A fresh target directory needs no per-file up-to-date check; mode bits are copied."""
+        source = tmp_path / "source"
+        source.mkdir()
+        track = source / "01.flac"
+        track.write_bytes(b"x" * 4096)
+        track.chmod(0o640)
+        monkeypatch.setattr(
+            "src.organizers.file_organizer._up_to_date",
+            lambda *args: pytest.fail("stat of a target that cannot exist"),
+        )
+
+        organizer.organize_folder(source, {"artist": "A", "album": "B", "year": "2000"})
+
+        copy = tmp_path / "target" / "A" / "B (2000)" / "01.flac"
+        assert copy.stat().st_mode & 0o777 == 0o640
+
+    def test_sanitize_filename(self, organizer):
+        """Invalid characters become underscores and names are capped at 120 chars."""
+        assert organizer._sanitize_filename('a<b>c:"d"/e\\f|g?h*') == "a_b_c__d__e_f_g_h_"
+        assert organizer._sanitize_filename(" x" * 100) == ("x " * 60).strip()
+
+    def test_copy_pool_reused_across_albums(self, organizer, tmp_path, monkeypatch):
+        """The copy thread pool is created once and shared by later albums."""
+        monkeypatch.setenv("WTS_COPY_THREADS", "2")
+        for name in ("one", "two"):
+            source = tmp_path / name
+            source.mkdir()
+            (source / "01.flac").write_bytes(b"a")
+            (source / "02.flac").write_bytes(b"b")
+            assert organizer.organize_folder(source, {"artist": "A", "album": name, "year": "2000"}) == 2
+            if name == "one":
+                pool = organizer._copy_pool
+        assert pool is not None
+        assert organizer._copy_pool is pool
+
+    def test_close_shuts_down_the_copy_pool(self, organizer, tmp_path, monkeypatch):
+        """close() releases the pool's threads; a later album starts a new pool."""
+        monkeypatch.setenv("WTS_COPY_THREADS", "2")
+        source = tmp_path / "source"
+        source.mkdir()
+        (source / "01.flac").write_bytes(b"a")
+        (source / "02.flac").write_bytes(b"b")
+        proposal = {"artist": "A", "album": "B", "year": "2000"}
+        organizer.organize_folder(source, proposal)
+        pool = organizer._copy_pool
+
+        organizer.close()
+
+        assert organizer._copy_pool is None
+        with pytest.raises(RuntimeError):
+            pool.submit(print)
+        assert organizer.organize_folder(source, proposal) == 2
+        organizer.close()
+
+    def test_link_mode_hardlinks_on_same_filesystem(self, tmp_path):
+        """In link mode the organized file shares the source's inode."""
+        source = tmp_path / "source"
+        source.mkdir()
+        (source / "01.flac").write_bytes(b"flac-data")
+
+        organizer = FileOrganizer(tmp_path / "target", copy_mode="link")
+        assert organizer.organize_folder(source, {"artist": "A", "album": "B", "year": "2000"}) == 1
+
+        copy = tmp_path / "target" / "A" / "B (2000)" / "01.flac"
+        assert copy.stat().st_ino == (source / "01.flac").stat().st_ino
+
+    @pytest.mark.parametrize("copy_mode", ["copy", "reflink"])
+    def test_copy_over_hardlinked_target_leaves_source_intact(self, tmp_path, copy_mode):
+        """Re-copying over a link-mode target replaces the link instead of truncating the source."""
+        source = tmp_path / "source"
+        source.mkdir()
+        (source / "01.mp3").write_bytes(b"mp3-data")
+        proposal = {"artist": "A", "album": "B", "year": "2000"}
+        FileOrganizer(tmp_path / "target", copy_mode="link").organize_folder(source, proposal)
+
+        organizer = FileOrganizer(tmp_path / "target", copy_mode=copy_mode, preserve_stat=False)
+        assert organizer.organize_folder(source, proposal) == 1
+
+        copy = tmp_path / "target" / "A" / "B (2000)" / "01.mp3"
+        assert (source / "01.mp3").read_bytes() == b"mp3-data"
+        assert copy.read_bytes() == b"mp3-data"
+        assert copy.stat().st_ino != (source / "01.mp3").stat().st_ino
+
+    def test_preserve_stat_from_env(self, tmp_path, monkeypatch):
+        """WTS_PRESERVE_STAT=0 turns copystat off unless the constructor says otherwise."""
+        monkeypatch.setenv("WTS_PRESERVE_STAT", "0")
+        assert FileOrganizer(tmp_path).preserve_stat is False
+        assert FileOrganizer(tmp_path, preserve_stat=True).preserve_stat is True
+        monkeypatch.delenv("WTS_PRESERVE_STAT")
+        assert FileOrganizer(tmp_path).preserve_stat is True
+
+    def test_reflink_mode_falls_back_to_copy(self, tmp_path, monkeypatch):
+        """When cloning is refused the file is still copied."""
+        monkeypatch.setenv("WTS_COPY_MODE", "reflink")
+        monkeypatch.setattr("src.organizers.file_organizer._reflink_file", lambda src, dst, *args: False)
+        source = tmp_path / "source"
+        source.mkdir()
+        (source / "01.flac").write_bytes(b"flac-data")
+
+        organizer = FileOrganizer(tmp_path / "target")
+        assert organizer.copy_mode == "reflink"
+        assert organizer.organize_folder(source, {"artist": "A", "album": "B", "year": "2000"}) == 1
+        assert (tmp_path / "target" / "A" / "B (2000)" / "01.flac").read_bytes() == b"flac-data"
+
+    def test_invalid_copy_mode_rejected(self, tmp_path):
+        """Unknown copy modes fail fast instead of silently copying."""
+        with pytest.raises(ValueError):
+            FileOrganizer(tmp_path, copy_mode="move")
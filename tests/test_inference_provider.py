@@ -102,6 +102,54 @@ class TestLlamaTextProvider:
             assert args[0].endswith("/chat/completions")
             assert kwargs["json"]["model"] == "llama-xyz"
             assert kwargs["json"]["messages"][0]["content"] == "prompt"
+            assert "max_tokens" not in kwargs["json"]
+
+            provider.generate("prompt", model="llama-xyz", max_tokens=16)
+            assert fake_requests.post.call_args.kwargs["json"]["max_tokens"] == 16
+
+    def test_expect_json_stops_reading_stream(self):
+        import json as _json
+
+        deltas = ['Sure: {"artist": "A", ', '"note": "a } brace"', "}", " and more", " text"]
+        lines = [f"data: {_json.dumps({'choices': [{'delta': {'content': d}}]})}" for d in deltas]
+        consumed = []
+
+        def iter_lines(decode_unicode=True):
+            for line in lines:
+                consumed.append(line)
+                yield line
+
+        fake_resp = MagicMock()
+        fake_resp.__enter__.return_value = fake_resp
+        fake_resp.iter_lines.side_effect = iter_lines
+        fake_requests = MagicMock()
+        fake_requests.post.return_value = fake_resp
+
+        with patch("src.inference.requests", fake_requests):
+            provider = LlamaTextProvider(base_url="http://x")
+            out = provider.generate("prompt", model="llama-xyz", expect_json=True)
+
+        assert out == 'Sure: {"artist": "A", "note": "a } brace"}'
+        assert len(consumed) == 3
+        assert fake_requests.post.call_args.kwargs["json"]["stream"] is True
+        assert fake_requests.post.call_args.kwargs["json"]["response_format"] == {"type": "json_object"}
+
+    def test_json_schema_becomes_structured_response_format(self):
+        fake_resp = MagicMock()
+        fake_resp.__enter__.return_value = fake_resp
+        fake_resp.iter_lines.return_value = iter(['data: {"choices": [{"delta": {"content": "{}"}}]}'])
+        fake_requests = MagicMock()
+        fake_requests.post.return_value = fake_resp
+        schema = {"type": "object", "required": ["artist"]}
+
+        with patch("src.inference.requests", fake_requests):
+            provider = LlamaTextProvider(base_url="http://x")
+            assert provider.generate("prompt", model="llama-xyz", expect_json=True, json_schema=schema) == "{}"
+
+        assert fake_requests.post.call_args.kwargs["json"]["response_format"] == {
+            "type": "json_schema",
+            "json_schema": {"name": "response", "schema": schema},
+        }
 
 
 class TestInferenceProviderFacade:
@@ -147,3 +195,18 @@ class TestInferenceProviderFacade:
                 assert inf.generate("p") == "ll-out"
 
 
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "sk-test", "STREAM_PROMPTS": "0"})
+def test_openai_client_is_reused_across_calls():
+    fake_client = MagicMock()
+    fake_choice = MagicMock()
+    fake_choice.message.content = "again"
+    fake_client.chat.completions.create.return_value.choices = [fake_choice]
+
+    with patch("src.inference.OpenAI", return_value=fake_client) as factory:
+        provider = OpenAITextProvider()
+        provider.generate("one", model="gpt-5")
+        provider.generate("two", model="gpt-5")
+
+    factory.assert_called_once_with(api_key="sk-test")
@@ -34,6 +34,23 @@ def test_claim_moves_to_analyzing(tmp_path: Path):
     assert counts.get("analyzing", 0) == 1
 
 
+def test_claim_batch_takes_oldest_queued(tmp_path: Path):
+    store = make_store(tmp_path)
+    folders = []
+    for name in ("a", "b", "c"):
+        folder = tmp_path / name
+        folder.mkdir()
+        store.enqueue(folder, {})
+        folders.append(str(folder))
+    claimed = store.claim_queued_for_analysis_batch(2)
+    assert [job.folder_path for job in claimed] == folders[:2]
+    counts = store.counts()
+    assert counts.get("analyzing", 0) == 2
+    assert counts.get("queued", 0) == 1
+    assert [job.folder_path for job in store.claim_queued_for_analysis_batch(5)] == folders[2:]
+    assert store.claim_queued_for_analysis_batch(5) == []
+
+
 def test_approve_and_fetch_ready(tmp_path: Path):
     store = make_store(tmp_path)
     folder = tmp_path / "album3"
@@ -1,5 +1,6 @@
 """Tests for the metadata extraction module."""
 
+import os
 import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
@@ -216,3 +217,21 @@ class TestMetadataExtractor:
 
         analysis = metadata_extractor._analyze_metadata_patterns(files_metadata)
         assert analysis["track_number_pattern"] == "unknown"
+
+    def test_extract_file_metadata_uses_given_stat(self, metadata_extractor, tmp_path):
+        """A caller-supplied stat is used for size instead of re-statting the file."""
+        test_file = tmp_path / "test.wav"
+        test_file.write_bytes(b"x" * 10)
+        fake_stat = os.stat_result((0, 0, 0, 0, 0, 0, 2 * 1024 * 1024, 0, 0, 0))
+
+        with patch.object(metadata_extractor, "_extract_generic", return_value={}):
+            result = metadata_extractor.extract_file_metadata(test_file, stat_result=fake_stat)
+
+        assert result["file_size_mb"] == 2.0
+
+    def test_supported_re_matches_supported_suffixes(self, metadata_extractor):
+        """The filename regex and is_music_name agree with Path.suffix membership in SUPPORTED_FORMATS."""
+        for name in ["01 - Song.FLAC", "a.mp3", "b.tar.ogg", ".mp3", "..mp3", "a.", "mp3", "cover.jpg", "notes.mp3.txt"]:
+            expected = Path(name).suffix.lower() in metadata_extractor.SUPPORTED_FORMATS
+            assert bool(metadata_extractor.SUPPORTED_RE.search(name)) == expected
+            assert metadata_extractor.is_music_name(name) == expected
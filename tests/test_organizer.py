@@ -1 +1,63 @@
+from pathlib import Path
+from unittest.mock import Mock
 
+from src.organizer import MusicOrganizer
+
+
+def test_update_paths_resets_components_in_place(tmp_path: Path):
+    inference = Mock()
+    inference.model = "test-model"
+    organizer = MusicOrganizer(inference, Path("model.gguf"), tmp_path / "src", tmp_path / "dst")
+    file_organizer = organizer.file_organizer
+    tracker = organizer.progress_tracker
+    tracker.increment_processed()
+
+    organizer.update_paths(tmp_path / "src2", tmp_path / "dst2")
+
+    assert organizer.file_organizer is file_organizer
+    assert file_organizer.target_dir == tmp_path / "dst2"
+    assert organizer.progress_tracker is tracker
+    assert tracker.get_stats()["total_processed"] == 0
+
+
+def test_workers_start_on_request_and_only_once(tmp_path: Path, monkeypatch):
+    from src import organizer as organizer_module
+
+    monkeypatch.delenv("PYTEST_CURRENT_TEST", raising=False)
+    monkeypatch.delenv("WTS_DISABLE_WORKERS", raising=False)
+    process = Mock()
+    monkeypatch.setattr(organizer_module.multiprocessing, "Process", process)
+    inference = Mock()
+    inference.model = "test-model"
+
+    organizer = MusicOrganizer(inference, Path("model.gguf"), tmp_path / "src", tmp_path / "dst")
+    process.assert_not_called()
+
+    organizer.start_workers()
+    organizer.start_workers()
+    assert process.call_count == 2
+    assert len(organizer.worker_processes) == 2
+
+
+def test_stop_workers_gives_the_move_worker_longer_then_terminates(tmp_path: Path, monkeypatch):
+    from src import organizer as organizer_module
+
+    monkeypatch.delenv("PYTEST_CURRENT_TEST", raising=False)
+    monkeypatch.delenv("WTS_DISABLE_WORKERS", raising=False)
+    # Both workers are still busy after their limits
+    processes = [Mock(**{"is_alive.return_value": True}) for _ in range(2)]
+    monkeypatch.setattr(organizer_module.multiprocessing, "Process", Mock(side_effect=processes))
+    inference = Mock()
+    inference.model = "test-model"
+    organizer = MusicOrganizer(inference, Path("model.gguf"), tmp_path / "src", tmp_path / "dst")
+    organizer.start_workers()
+
+    organizer.stop_workers(timeout=0.0, move_timeout=30.0)
+
+    move, analyze = processes
+    (move_wait,), _ = move.join.call_args
+    assert 0 < move_wait <= 30.0
+    analyze.join.assert_called_once_with(0.0)
+    move.terminate.assert_called_once()
+    analyze.terminate.assert_called_once()
+    assert organizer.worker_processes == []
@@ -24,3 +24,45 @@ def test_startup_prefetch(tmp_path: Path, monkeypatch):
         # Either still queued/analyzing or already completed depending on worker timing
         assert sum(counts.values()) >= 1
 
+
+
+def test_status_total_tracks_source_changes(tmp_path: Path):
+    source = tmp_path / "source"
+    target = tmp_path / "target"
+    (source / "albumA").mkdir(parents=True)
+
+    org = MusicOrganizer(InferenceProvider(provider="llama", model="llama3.1"), tmp_path / "model.gguf", source, target)
+
+    with TestClient(create_app(org)) as client:
+        assert client.get("/api/status").json()["total"] == 1
+        (source / "albumB").mkdir()
+        assert client.get("/api/status").json()["total"] == 2
+
+
+def test_reconsider_requeues_without_reading_the_folder(tmp_path: Path):
+    import json
+    from unittest.mock import Mock
+
+    from src.jobs import SQLiteJobStore
+
+    source = tmp_path / "source"
+    album = source / "Artist" / "CD1"
+    album.mkdir(parents=True)
+
+    org = MusicOrganizer(InferenceProvider(provider="llama", model="llama3.1"), tmp_path / "model.gguf", source, tmp_path / "target")
+    org.jobstore = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite"))
+    org.directory_analyzer = Mock()
+    org.jobstore.enqueue(album.parent, {})
+
+    with TestClient(create_app(org)) as client:
+        r = client.post(
+            "/api/decision",
+            json={"path": str(album), "action": "reconsider", "feedback": "two discs", "user_classification": "multi_disc_album"},
+        )
+        assert r.json() == {"ok": True}
+
+    org.directory_analyzer.extract_folder_metadata.assert_not_called()
+    job = org.jobstore.claim_queued_for_analysis()
+    assert job.folder_path == str(album.parent)
+    assert job.user_feedback == "two discs"
+    assert json.loads(job.metadata_json) == {"folder_name": "Artist", "user_classification": "multi_disc_album", "reconsider": True}
@@ -0,0 +1,242 @@
+import os
+
+import pytest
+
+from src.worker import _pin_worker
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Linux only")
+def test_pin_worker_is_opt_in_and_splits_cpu_and_io(monkeypatch):
+    pinned = []
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {3, 1, 2})
+    monkeypatch.setattr(os, "sched_setaffinity", lambda pid, cores: pinned.append(cores))
+
+    monkeypatch.delenv("WTS_CPU_AFFINITY", raising=False)
+    assert _pin_worker("cpu") is None
+    assert pinned == []
+
+    monkeypatch.setenv("WTS_CPU_AFFINITY", "1")
+    assert _pin_worker("cpu") == 1
+    assert _pin_worker("io") == 3
+    assert pinned == [{1}, {3}]
+
+
+def test_worker_loop_returns_promptly_when_stopped(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    from src.jobs import SQLiteJobStore
+    from src.worker import run_move_worker
+
+    monkeypatch.setenv("WTS_TARGET_DIR", str(tmp_path / "target"))
+    monkeypatch.setattr("src.worker.SQLiteJobStore", lambda: SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite")))
+    stop = threading.Event()
+    worker = threading.Thread(target=run_move_worker, kwargs={"poll_seconds": 60, "stop": stop})
+    worker.start()
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    stop.set()
+    worker.join(timeout=5)
+
+    assert not worker.is_alive()
+    assert time.monotonic() - started < 5
+
+
+def test_finish_analysis_dispatches_on_classification(tmp_path):
+    from pathlib import Path
+    from unittest.mock import Mock
+
+    from src.worker import _finish_analysis
+
+    claimed = Mock(job_id=7, user_feedback=None, artist_hint=None, metadata_json="{}")
+    jobstore, analyzer, generator = Mock(), Mock(), Mock()
+    analyzer.extract_folder_metadata.return_value = {"total_files": 3}
+    generator.get_llm_proposal.return_value = {"album": "A"}
+
+    _finish_analysis(jobstore, analyzer, generator, claimed, Path("/music/A"), {}, "multi_disc_album", None)
+    jobstore.approve.assert_called_once_with(7, {"album": "A"})
+
+    future = Mock()
+    _finish_analysis(jobstore, analyzer, generator, claimed, Path("/music/B"), {}, "undefined", future)
+    future.cancel.assert_called_once()
+    jobstore.update_latest_status_for_folder.assert_called_once_with(Path("/music/B"), ["analyzing"], "skipped")
+
+
+def test_collection_fan_out_skips_subfolders_without_music():
+    from pathlib import Path
+    from unittest.mock import Mock
+
+    from src.worker import _finish_analysis
+
+    jobstore, analyzer = Mock(), Mock()
+    jobstore.existing_folders.return_value = set()
+    analyzer.extract_folder_metadata.return_value = {"total_files": 2}
+    analyzer.subfolder_structures.return_value = {}
+    structure = {
+        "subdirectories": [
+            {"name": "Album", "path": "/music/Artist/Album", "music_files": 2},
+            {"name": "Scans", "path": "/music/Artist/Scans", "music_files": 0},
+        ]
+    }
+
+    _finish_analysis(jobstore, analyzer, Mock(), Mock(), Path("/music/Artist"), structure, "artist_collection", None)
+
+    analyzer.extract_folder_metadata.assert_called_once_with(Path("/music/Artist/Album"), None)
+    rows = list(jobstore.enqueue_many.call_args.args[0])
+    assert [row[0] for row in rows] == [Path("/music/Artist/Album")]
+
+
+def test_scan_pass_only_touches_folders_new_to_the_session(tmp_path, monkeypatch):
+    from unittest.mock import Mock
+
+    from src.worker import _scan_pass
+
+    for name in ("A", "B"):
+        (tmp_path / name).mkdir()
+    monkeypatch.setenv("WTS_SOURCE_DIR", str(tmp_path))
+    jobstore = Mock()
+    known = set()
+
+    _scan_pass(jobstore, known)
+    assert [row[0].name for row in jobstore.enqueue_many.call_args.args[0]] == ["A", "B"]
+    assert known == {str(tmp_path / "A"), str(tmp_path / "B")}
+
+    jobstore.enqueue_many.reset_mock()
+    _scan_pass(jobstore, known)
+    jobstore.enqueue_many.assert_not_called()
+
+    (tmp_path / "C").mkdir()
+    _scan_pass(jobstore, known)
+    assert [row[0].name for row in jobstore.enqueue_many.call_args.args[0]] == ["C"]
+
+
+def test_wait_for_change_returns_when_another_connection_commits(tmp_path):
+    import threading
+    import time
+    from pathlib import Path
+
+    from src.jobs import SQLiteJobStore
+    from src.worker import _wait_for_change
+
+    db = str(tmp_path / "jobs.sqlite")
+    store = SQLiteJobStore(db_path=db)
+    stop = threading.Event()
+
+    started = time.monotonic()
+    _wait_for_change(store, stop, 0.2)
+    assert time.monotonic() - started >= 0.2
+
+    writer = threading.Timer(0.1, lambda: SQLiteJobStore(db_path=db).enqueue(Path("/music/A"), {}))
+    writer.start()
+    started = time.monotonic()
+    _wait_for_change(store, stop, 30)
+    writer.join()
+    assert time.monotonic() - started < 5
+
+
+def test_reconsidered_album_bypasses_the_proposal_cache():
+    from pathlib import Path
+    from unittest.mock import Mock
+
+    from src.worker import _finish_analysis
+
+    jobstore, analyzer, generator = Mock(), Mock(), Mock()
+    analyzer.extract_folder_metadata.return_value = {"total_files": 3}
+    for metadata_json, refresh in (("{}", False), ('{"reconsider": true}', True)):
+        claimed = Mock(job_id=7, user_feedback=None, artist_hint=None, metadata_json=metadata_json)
+        _finish_analysis(jobstore, analyzer, generator, claimed, Path("/music/A"), {}, "single_album", None)
+        assert generator.get_llm_proposal.call_args.kwargs["refresh"] is refresh
+
+
+def _claimed(job_id, folder):
+    from unittest.mock import Mock
+
+    return Mock(job_id=job_id, folder_path=folder, metadata_json="{}", user_feedback=None, artist_hint=None)
+
+
+def test_analyze_batch_charges_errors_to_the_failing_job():
+    from concurrent.futures import ThreadPoolExecutor
+    from unittest.mock import Mock
+
+    from src.worker import _analyze_batch
+
+    def analyze(folder_path, render_tree=True):
+        if folder_path.name == "B":
+            raise OSError("unreadable")
+        return {"folder_path": str(folder_path)}
+
+    def propose(metadata, **kwargs):
+        if kwargs["folder_path"].endswith("C"):
+            raise RuntimeError("llm down")
+        return {"album": "A"}
+
+    jobstore, analyzer, generator, classifier = Mock(), Mock(), Mock(), Mock()
+    analyzer.analyze_directory_structure.side_effect = analyze
+    analyzer.extract_folder_metadata.return_value = {"total_files": 1}
+    generator.get_llm_proposal.side_effect = propose
+    classifier.classify_batch.return_value = ["single_album", "single_album"]
+    jobs = [_claimed(1, "/music/A"), _claimed(2, "/music/B"), _claimed(3, "/music/C")]
+
+    with ThreadPoolExecutor(2) as pool, ThreadPoolExecutor(1) as prefetch:
+        assert _analyze_batch(jobstore, analyzer, generator, classifier, jobs, pool, prefetch)
+
+    assert len(classifier.classify_batch.call_args.args[0]) == 2
+    jobstore.approve.assert_called_once_with(1, {"album": "A"})
+    assert [call.args[0] for call in jobstore.fail.call_args_list] == [2, 3]
+
+
+def test_analyze_batch_requeues_everything_when_classification_fails():
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+    from unittest.mock import Mock
+
+    from src.worker import _analyze_batch
+
+    jobstore, analyzer, generator, classifier = Mock(), Mock(), Mock(), Mock()
+    analyzer.analyze_directory_structure.return_value = {}
+    classifier.classify_batch.side_effect = RuntimeError("llm down")
+    jobs = [_claimed(1, "/music/A"), _claimed(2, "/music/B")]
+
+    with ThreadPoolExecutor(2) as pool, ThreadPoolExecutor(1) as prefetch:
+        assert not _analyze_batch(jobstore, analyzer, generator, classifier, jobs, pool, prefetch)
+
+    jobstore.fail.assert_not_called()
+    assert [call.args for call in jobstore.update_latest_status_for_folder.call_args_list] == [
+        (Path("/music/A"), ["analyzing"], "queued"),
+        (Path("/music/B"), ["analyzing"], "queued"),
+    ]
+
+
+def test_scan_move_worker_survives_a_failed_move(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    from src.jobs import SQLiteJobStore
+    from src import worker
+
+    monkeypatch.setenv("WTS_TARGET_DIR", str(tmp_path / "target"))
+    monkeypatch.setattr(worker, "SQLiteJobStore", lambda: SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite")))
+    monkeypatch.setattr(worker, "_scan_pass", lambda jobstore, known: None)
+    results = iter([RuntimeError("disk full"), True])
+    calls = []
+
+    def move_one(jobstore, organizer):
+        calls.append(1)
+        result = next(results, False)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(worker, "_move_one", move_one)
+    stop = threading.Event()
+    thread = threading.Thread(target=worker.run_scan_move_worker, kwargs={"poll_seconds": 60, "stop": stop})
+    thread.start()
+    deadline = time.monotonic() + 5
+    while len(calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    thread.join(timeout=5)
+
+    assert len(calls) >= 3
+    assert not thread.is_alive()
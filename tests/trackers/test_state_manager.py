@@ -0,0 +1,44 @@
+"""Tests for the StateManager class."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.trackers.state_manager import StateManager, TRACKER_FILENAME
+
+
+class TestStateManager:
+    """Test cases for StateManager class."""
+
+    @pytest.fixture
+    def manager(self):
+        """Create a StateManager instance for testing."""
+        return StateManager()
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_proposal_tracker_round_trip(self, manager, tmp_path, use_orjson):
+        """Trackers are indented UTF-8 JSON whichever encoder writes them."""
+        proposal = {"artist": "Björk", "album": "Homogenic", "year": "1997"}
+        if use_orjson:
+            pytest.importorskip("orjson")
+            manager.save_proposal_tracker(tmp_path, proposal)
+        else:
+            with patch("src.trackers.state_manager.orjson", None):
+                manager.save_proposal_tracker(tmp_path, proposal)
+
+        text = (tmp_path / TRACKER_FILENAME).read_text(encoding="utf-8")
+        assert '\n  "proposal": {' in text
+        assert "Björk" in text
+        assert json.loads(text)["proposal"] == proposal
+        assert manager.is_already_organized(tmp_path)
+        assert manager.load_tracker_data(tmp_path)["folder_name"] == tmp_path.name
+
+    def test_tracker_records_time_and_version(self, manager, tmp_path):
+        """organized_timestamp is epoch nanoseconds, not the working directory."""
+        with patch("src.trackers.state_manager.time.time_ns", return_value=1_700_000_000_000_000_000):
+            manager.save_collection_tracker(tmp_path, [{"album": "A"}])
+
+        data = manager.load_tracker_data(tmp_path)
+        assert data["organized_timestamp"] == 1_700_000_000_000_000_000
+        assert data["organized_version"] == 1